@@ -1,14 +1,20 @@
 from canoser.cursor import Cursor  # noqa: F401
+from canoser.writer import Writer  # noqa: F401
+from canoser.errors import BufferUnderflowError  # noqa: F401
 from canoser.struct import Struct  # noqa: F401
 from canoser.rust_enum import RustEnum  # noqa: F401
 from canoser.rust_optional import RustOptional  # noqa: F401
 from canoser.delegate_t import DelegateT  # noqa: F401
 from canoser.tuple_t import TupleT  # noqa: F401
 from canoser.map_t import MapT  # noqa: F401
+from canoser.canonical_map import CanonicalMap  # noqa: F401
 from canoser.str_t import StrT  # noqa: F401
 from canoser.bytes_t import BytesT  # noqa: F401
 from canoser.bool_t import BoolT  # noqa: F401
 from canoser.array_t import ArrayT  # noqa: F401
 from canoser.int_type import Uint8, Uint16, Uint32, Uint64, Int8, Int16, Int32, Int64  # noqa: F401
 from canoser.int_type import Uint128, Int128  # noqa: F401
+from canoser.incremental import IncrementalDecoder  # noqa: F401
+from canoser.parallel import parallel_deserialize_many  # noqa: F401
+from canoser.store import RecordWriter, RecordReader  # noqa: F401
 from canoser.util import bytes_to_int_list, hex_to_int_list  # noqa: F401
@@ -0,0 +1,86 @@
+"""
+Decoding of records read from an asyncio.StreamReader.
+"""
+from canoser.cursor import Cursor
+from canoser.incremental import IncrementalDecoder, read_uleb128
+from canoser.stream import FRAMINGS
+from collections import deque
+import asyncio
+
+
+async def read_from(atype, reader, validate=False, head=b''):
+    """
+    Read and decode one value, awaiting exactly the bytes each step of the decode needs.
+    `head` holds the first bytes of the value if they are already read.
+    """
+    decoder = await _feed_from(IncrementalDecoder(atype, validate), reader, head)
+    if decoder.unused_data:
+        raise IOError(f"{atype} decodes from 0 bytes, use the 'uleb128' framing for its records")
+    return decoder.value
+
+
+async def read_frame(reader, head=b''):
+    """
+    Read the bytes of one record prefixed by its ULEB128 length.
+    """
+    decoder = await _feed_from(IncrementalDecoder.of_steps(read_uleb128()), reader, head)
+    size, _ = decoder.value
+    return await reader.readexactly(size)
+
+
+async def _feed_from(decoder, reader, head):
+    decoder.feed(head)
+    while not decoder.done:
+        decoder.feed(await reader.readexactly(decoder.needed))
+    return decoder
+
+
+def decode_frame(atype, data, validate=False):
+    cursor = Cursor(data, validate=validate)
+    ret = atype.decode(cursor)
+    if not cursor.is_finished():
+        raise IOError("bytes not all consumed:{}, {}".format(len(data), cursor.offset))
+    return ret
+
+
+async def iter_from(atype, reader, framing='concat', validate=False,
+                    executor=None, offload_size=65536, max_pending=4):
+    """
+    Yield the records read from `reader` until EOF. With the 'uleb128' framing,
+    records of at least `offload_size` bytes are decoded in `executor`, the loop's
+    default one if None. At most `max_pending` of them are decoded at once, no more
+    bytes are read from `reader` while they are all busy, and the records are still
+    yielded in order.
+    """
+    if framing not in FRAMINGS:
+        raise TypeError("framing should be one of {}, got {}".format(FRAMINGS, framing))
+    loop = asyncio.get_event_loop()
+    pending = deque()
+    busy = 0
+    while True:
+        head = await reader.read(1)
+        if not head:
+            break
+        if framing == 'concat':
+            yield await read_from(atype, reader, validate, head)
+            continue
+        data = await read_frame(reader, head)
+        offloaded = len(data) >= offload_size
+        if not offloaded and not pending:
+            yield decode_frame(atype, data, validate)
+            continue
+        if offloaded:
+            future = loop.run_in_executor(executor, decode_frame, atype, data, validate)
+            busy += 1
+        else:
+            future = loop.create_future()
+            future.set_result(decode_frame(atype, data, validate))
+        pending.append((future, offloaded))
+        # yield the records that are ready, wait for the oldest one while the workers are all busy
+        while pending and (pending[0][0].done() or busy >= max_pending):
+            future, offloaded = pending.popleft()
+            value = await future
+            busy -= offloaded
+            yield value
+    while pending:
+        yield await pending.popleft()[0]
@@ -1,5 +1,7 @@
 from canoser.base import Base
-from canoser.int_type import Uint32, Uint8
+from canoser.int_type import IntType, Uint8
+from canoser.writer import Writer
+from canoser.uleb128 import encode_uleb128
 import struct
 
 
@@ -13,45 +15,114 @@ class ArrayT(Base):
             raise TypeError("variable length sequences must encode len.")
         self.fixed_len = fixed_len
         self.encode_len = encode_len
+        # Vec<u8> is encoded, decoded and checked as one run of bytes
+        self.is_bytes = atype is Uint8
+        self.is_int = isinstance(atype, type) and issubclass(atype, IntType)
+        # other fixed width ints are packed and unpacked with one repeated struct format
+        self.pack_code = None
+        if self.is_int and not self.is_bytes and hasattr(atype, 'pack_str'):
+            self.pack_code = atype.pack_str[1:]
 
     def encode(self, arr):
+        writer = Writer()
+        self.encode_into(writer, arr)
+        return writer.getvalue()
+
+    def encode_into(self, writer, arr):
         if self.fixed_len is not None and len(arr) != self.fixed_len:
             raise TypeError(f"{len(arr)} is not equal to predefined value: {self.fixed_len}")
-        output = b""
         if self.encode_len:
-            output += Uint32.serialize_uint32_as_uleb128(len(arr))
+            writer.write_uleb128(len(arr))
+        if self.is_bytes:
+            writer.write(arr)
+            return
+        if self.pack_code is not None:
+            writer.write(struct.pack(f"<{len(arr)}{self.pack_code}", *arr))
+            return
+        encode_into = self.atype.encode_into
         for item in arr:
-            output += self.atype.encode(item)
-        return output
+            encode_into(writer, item)
+
+    def read_size(self, cursor):
+        if not self.encode_len:
+            return self.fixed_len
+        size = cursor.read_uleb128()
+        if self.fixed_len is not None and size != self.fixed_len:
+            raise TypeError(f"{size} is not equal to predefined value: {self.fixed_len}")
+        return size
 
     def decode(self, cursor):
-        arr = []
-        if self.encode_len:
-            size = Uint32.parse_uint32_from_uleb128(cursor)
-            if self.fixed_len is not None and size != self.fixed_len:
-                raise TypeError(f"{size} is not equal to predefined value: {self.fixed_len}")
-        else:
-            size = self.fixed_len
+        size = self.read_size(cursor)
+        if self.is_bytes:
+            return list(cursor.read_bytes(size))
+        if self.pack_code is not None:
+            return list(cursor.read_array(f"<{size}{self.pack_code}", size * self.atype.byte_lens))
+        decode = self.atype.decode
+        return [decode(cursor) for _ in range(size)]
+
+    def skip(self, cursor):
+        size = self.read_size(cursor)
+        item_size = self.atype.fixed_size()
+        if item_size is not None:
+            cursor.skip(size * item_size)
+            return
+        skip = self.atype.skip
         for _ in range(size):
-            arr.append(self.atype.decode(cursor))
-        return arr
+            skip(cursor)
+
+    def view(self, buffer, index=None):
+        """
+        Random access to the elements of a serialized array, see VecView.
+        """
+        from canoser.view import VecView
+        return VecView(self, buffer, index)
+
+    def fixed_size(self):
+        if self.fixed_len is None:
+            return None
+        size = self.atype.fixed_size()
+        if size is None:
+            return None
+        if self.encode_len:
+            return len(encode_uleb128(self.fixed_len)) + self.fixed_len * size
+        return self.fixed_len * size
 
     def check_value(self, arr):
         if self.fixed_len is not None and len(arr) != self.fixed_len:
             raise TypeError("arr len not match: {}-{}".format(len(arr), self.fixed_len))
         if not isinstance(arr, list):
             raise TypeError(f"{arr} is not a list.")
+        if self.is_int and self.check_int_range(arr):
+            return
         for item in arr:
             self.atype.check_value(item)
 
+    def check_int_range(self, arr):
+        """
+        Range check a list of plain ints in one pass, return False if it holds other values.
+        """
+        if not arr:
+            return True
+        if set(map(type, arr)) != {int}:
+            return False
+        if min(arr) < self.atype.min_value or max(arr) > self.atype.max_value:
+            raise TypeError('value not in range {}-{}'.format(self.atype.min_value, self.atype.max_value))
+        return True
+
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, ArrayT):
             return False
-        return self.atype == other.atype and self.fixed_len == other.fixed_len
+        return self.atype == other.atype and self.fixed_len == other.fixed_len and \
+            self.encode_len == other.encode_len
+
+    def __hash__(self):
+        return hash((ArrayT, self.atype, self.fixed_len, self.encode_len))
 
     def to_json_serializable(cls, obj):
-        if cls.atype == Uint8:
-            return struct.pack("<{}B".format(len(obj)), *obj).hex()
+        if cls.is_bytes:
+            return bytes(obj).hex()
         ret = []
         for _, item in enumerate(obj):
             data = cls.atype.to_json_serializable(item)
@@ -1,28 +1,163 @@
 from canoser.cursor import Cursor
+from canoser.writer import Writer
+from canoser.stream import FRAMINGS, iter_deserialize
+from array import array
 
 
 class Base:
     """
-    All types should implment following four methods:
+    All types should implment following six methods:
 
     def encode(cls_or_obj, value)
 
+    def encode_into(cls_or_obj, writer, value)
+
     def decode(cls_or_obj, cursor)
 
+    def skip(cls_or_obj, cursor)
+
     def check_value(cls_or_obj, value)
 
     def to_json_serializable(obj)
     def to_json_serializable(acls, value)
+
+    Types whose encoded values always have the same length also override fixed_size.
+    A type that only implements encode gets an encode_into writing what encode returns.
     """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # the encode_into of a base class would not call the encode overridden here
+        if 'encode' in cls.__dict__ and 'encode_into' not in cls.__dict__:
+            cls.encode_into = Base.__dict__['encode_into']
+
+    @classmethod
+    def encode_into(cls, writer, value):
+        writer.write(cls.encode(value))
 
-    def serialize(self):
-        return self.__class__.encode(self)
+    @classmethod
+    def fixed_size(cls):
+        return None
+
+    @classmethod
+    def skip(cls, cursor):
+        """
+        Advance the cursor past an encoded value without building it.
+        """
+        size = cls.fixed_size()
+        if size is None:
+            cls.decode(cursor)
+        else:
+            cursor.skip(size)
+
+    def serialize(self, buffer=None):
+        """
+        Return the serialized bytes, or append them to `buffer` (a bytearray) and return it.
+        """
+        writer = Writer(buffer)
+        self.__class__.encode_into(writer, self)
+        if buffer is None:
+            return writer.getvalue()
+        return buffer
 
     @classmethod
-    def deserialize(cls, buffer, check=True):
-        cursor = Cursor(buffer)
-        ret = cls.decode(cursor)
+    def deserialize(cls, buffer, check=True, zero_copy=False, views=False, validate=False, fields=None):
+        """
+        With `fields`, only these fields of a struct are decoded, the others are skipped.
+        The bytes after the last of them are only skipped if `check` is True.
+        """
+        cursor = Cursor(buffer, zero_copy=zero_copy, views=views, validate=validate)
+        size = cls.fixed_size()
+        if check and size is not None and cursor.buffer_len != size:
+            raise IOError("{} bytes expected, got {}".format(size, cursor.buffer_len))
+        if fields is None:
+            ret = cls.decode(cursor)
+        else:
+            ret = cls.decode_fields(cursor, fields, check)
         if not cursor.is_finished() and check:
             raise IOError("bytes not all consumed:{}, {}".format(
-                len(buffer), cursor.offset))
+                cursor.buffer_len, cursor.offset))
         return ret
+
+    @classmethod
+    def decode_fields(cls, cursor, fields, to_end=True):
+        raise TypeError(f"{cls} has no fields")
+
+    @classmethod
+    def serialize_many(cls, objs):
+        """
+        Serialize objs back to back into one buffer. Return the bytes and an array of
+        len(objs) + 1 offsets, record i is buffer[offsets[i]:offsets[i+1]].
+        """
+        writer = Writer()
+        buffer = writer.buffer
+        encode_into = cls.encode_into
+        offsets = array('Q', [0])
+        for obj in objs:
+            encode_into(writer, obj)
+            offsets.append(len(buffer))
+        return writer.getvalue(), offsets
+
+    @classmethod
+    def deserialize_many(cls, buffers, offsets=None, check=True, zero_copy=False, validate=False):
+        """
+        Deserialize a list of buffers, or one buffer of concatenated records. The records
+        are delimited by `offsets` as returned by serialize_many, or else decoded back to
+        back until the buffer is consumed.
+        """
+        decode = cls.decode
+        ret = []
+        if isinstance(buffers, (list, tuple)) and buffers and not isinstance(buffers[0], int):
+            cursor = Cursor(b'', zero_copy=zero_copy, validate=validate)
+            for buffer in buffers:
+                cursor.reset(buffer)
+                ret.append(decode(cursor))
+                if check and not cursor.is_finished():
+                    raise IOError("bytes not all consumed:{}, {}".format(len(buffer), cursor.offset))
+            return ret
+        cursor = Cursor(buffers, zero_copy=zero_copy, validate=validate)
+        if offsets is None:
+            while not cursor.is_finished():
+                start = cursor.offset
+                ret.append(decode(cursor))
+                if cursor.offset == start:
+                    raise IOError(f"{cls} decodes from 0 bytes, its records need offsets to be delimited")
+            return ret
+        for i in range(len(offsets) - 1):
+            cursor.offset = offsets[i]
+            ret.append(decode(cursor))
+            if check and cursor.offset != offsets[i + 1]:
+                raise IOError("record {} ends at {}, not {}".format(i, cursor.offset, offsets[i + 1]))
+        return ret
+
+    @classmethod
+    def iter_deserialize(cls, fp, framing='concat', chunk_size=65536, validate=False):
+        """
+        Iterate over the records of a binary file-like object, reading `chunk_size` bytes
+        ahead at a time. `framing` is 'concat' for back to back records, as written by
+        serialize_many, or 'uleb128' for records prefixed by their length.
+        """
+        return iter_deserialize(cls, fp, framing, chunk_size, validate)
+
+    @classmethod
+    async def read_from(cls, reader, framing='concat', validate=False):
+        """
+        Read one record from an asyncio.StreamReader, see iter_deserialize for `framing`.
+        """
+        if framing not in FRAMINGS:
+            raise TypeError("framing should be one of {}, got {}".format(FRAMINGS, framing))
+        from canoser import aio
+        if framing == 'uleb128':
+            return aio.decode_frame(cls, await aio.read_frame(reader), validate)
+        return await aio.read_from(cls, reader, validate)
+
+    @classmethod
+    def iter_from(cls, reader, framing='concat', validate=False,
+                  executor=None, offload_size=65536, max_pending=4):
+        """
+        Asynchronously iterate over the records of an asyncio.StreamReader until EOF.
+        Large 'uleb128' framed records are decoded in `executor`, see canoser.aio.iter_from.
+        """
+        from canoser import aio
+        return aio.iter_from(cls, reader, framing, validate, executor, offload_size, max_pending)
@@ -9,6 +9,13 @@ class BoolT(Base):
         else:
             return b'\0'
 
+    @classmethod
+    def encode_into(self, writer, value):
+        if value:
+            writer.write_u8(1)
+        else:
+            writer.write_u8(0)
+
     @classmethod
     def decode_bytes(self, value):
         if value == b'\0':
@@ -20,8 +27,11 @@ class BoolT(Base):
 
     @classmethod
     def decode(self, cursor):
-        value = cursor.read_bytes(1)
-        return self.decode_bytes(value)
+        return cursor.read_bool()
+
+    @classmethod
+    def fixed_size(cls):
+        return 1
 
     @classmethod
     def check_value(self, value):
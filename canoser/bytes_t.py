@@ -1,5 +1,6 @@
-from canoser.int_type import Uint32
 from canoser.base import Base
+from canoser.writer import Writer
+from canoser.uleb128 import encode_uleb128
 
 
 class BytesT(Base):
@@ -13,32 +14,55 @@ class BytesT(Base):
         self.encode_len = encode_len
 
     def encode(self, value):
-        output = b""
+        writer = Writer()
+        self.encode_into(writer, value)
+        return writer.getvalue()
+
+    def encode_into(self, writer, value):
         if self.encode_len:
-            output += Uint32.serialize_uint32_as_uleb128(len(value))
-        output += value
-        return output
+            writer.write_uleb128(len(value))
+        writer.write(value)
+
+    def read_size(self, cursor):
+        if not self.encode_len:
+            return self.fixed_len
+        size = cursor.read_uleb128()
+        if self.fixed_len is not None and size != self.fixed_len:
+            raise TypeError(f"{size} is not equal to predefined value: {self.fixed_len}")
+        return size
 
     def decode(self, cursor):
-        if self.encode_len:
-            size = Uint32.parse_uint32_from_uleb128(cursor)
-            if self.fixed_len is not None and size != self.fixed_len:
-                raise TypeError(f"{size} is not equal to predefined value: {self.fixed_len}")
-        else:
-            size = self.fixed_len
+        size = self.read_size(cursor)
+        if cursor.views:
+            return cursor.read_view(size)
         return cursor.read_bytes(size)
 
+    def skip(self, cursor):
+        cursor.skip(self.read_size(cursor))
+
+    def fixed_size(self):
+        if self.fixed_len is None:
+            return None
+        if self.encode_len:
+            return len(encode_uleb128(self.fixed_len)) + self.fixed_len
+        return self.fixed_len
+
     def check_value(self, value):
-        if not isinstance(value, bytes):
+        if not isinstance(value, (bytes, memoryview)):
             raise TypeError('value {} is not bytes'.format(value))
         if self.fixed_len is not None and len(value) != self.fixed_len:
             raise TypeError("len not match: {}-{}".format(len(value), self.fixed_len))
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, BytesT):
             return False
         return self.fixed_len == other.fixed_len and self.encode_len == other.encode_len
 
+    def __hash__(self):
+        return hash((BytesT, self.fixed_len, self.encode_len))
+
     def to_json_serializable(cls, obj):
         return obj.hex()
 
@@ -46,17 +70,25 @@ class BytesT(Base):
 class ByteArrayT(Base):
 
     def encode(self, value):
-        output = b""
-        output += Uint32.serialize_uint32_as_uleb128(len(value))
-        output += bytes(value)
-        return output
+        writer = Writer()
+        self.encode_into(writer, value)
+        return writer.getvalue()
+
+    def encode_into(self, writer, value):
+        writer.write_uleb128(len(value))
+        writer.write(value)
 
     def decode(self, cursor):
-        size = Uint32.parse_uint32_from_uleb128(cursor)
+        size = cursor.read_uleb128()
+        if cursor.views:
+            return cursor.read_view(size)
         return bytearray(cursor.read_bytes(size))
 
+    def skip(self, cursor):
+        cursor.skip(cursor.read_uleb128())
+
     def check_value(self, value):
-        if not isinstance(value, bytearray):
+        if not isinstance(value, (bytearray, memoryview)):
             raise TypeError('value {} is not bytearray'.format(value))
 
     def __eq__(self, other):
@@ -64,5 +96,8 @@ class ByteArrayT(Base):
             return False
         return True
 
+    def __hash__(self):
+        return hash(ByteArrayT)
+
     def to_json_serializable(cls, obj):
         return obj.hex()
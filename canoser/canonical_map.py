@@ -0,0 +1,78 @@
+"""
+A mutable mapping that keeps its entries in LCS order as they are inserted and deleted.
+"""
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from operator import itemgetter
+from canoser.map_t import MapT
+from canoser.types import type_mapping
+
+
+class CanonicalMap(MutableMapping):
+    """
+    Entries ordered by the bytes of their encoded keys. The encoded keys are kept in a
+    sorted list, in parallel with the keys, and maintained with bisect on each update,
+    so that MapT serializes the map with a linear walk, without encoding a key or sorting.
+
+        balances = CanonicalMap(str, {"alice": 1})
+        balances["bob"] = 2
+        MapT(StrT, Uint64).encode(balances)
+    """
+
+    hashable_key = staticmethod(MapT.hashable_key)
+
+    def __init__(self, ktype, kvs=None):
+        self.ktype = type_mapping(ktype)
+        self._data = {self.hashable_key(k): v for k, v in dict(kvs or {}).items()}
+        # the initial entries are sorted once, later ones are inserted in place
+        self._encoded = {k: self.ktype.encode(k) for k in self._data}
+        entries = sorted(self._encoded.items(), key=itemgetter(1))
+        self._keys = [k for k, _ in entries]
+        self._names = [name for _, name in entries]
+
+    def __getitem__(self, k):
+        return self._data[self.hashable_key(k)]
+
+    def __setitem__(self, k, v):
+        k = self.hashable_key(k)
+        if k not in self._data:
+            name = self.ktype.encode(k)
+            i = bisect_left(self._names, name)
+            self._names.insert(i, name)
+            self._keys.insert(i, k)
+            self._encoded[k] = name
+        self._data[k] = v
+
+    def __delitem__(self, k):
+        k = self.hashable_key(k)
+        del self._data[k]
+        i = bisect_left(self._names, self._encoded.pop(k))
+        del self._names[i]
+        del self._keys[i]
+
+    def __contains__(self, k):
+        return self.hashable_key(k) in self._data
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._names.clear()
+        self._keys.clear()
+        self._data.clear()
+        self._encoded.clear()
+
+    def encoded_items(self):
+        """
+        Pairs of (encoded key, value) in canonical order.
+        """
+        return zip(self._names, map(self._data.__getitem__, self._keys))
+
+    def __reduce__(self):
+        return self.__class__, (self.ktype, dict(self._data))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._data!r})"
@@ -0,0 +1,254 @@
+"""
+Code generation of the per-class Struct codecs.
+
+Consecutive fields with a fixed layout (fixed width ints, bool, fixed length bytes and
+int arrays, tuples and structs made of the same) are packed and unpacked together
+with one precompiled struct.Struct, other fields call the codec of their type.
+"""
+from canoser.int_type import IntType
+from canoser.bool_t import BoolT
+from canoser.array_t import ArrayT
+from canoser.bytes_t import BytesT
+from canoser.tuple_t import TupleT
+from canoser.delegate_t import DelegateT
+from canoser.uleb128 import encode_uleb128
+from keyword import iskeyword
+import struct
+
+MASK64 = 0xffffffffffffffff
+CODEC = ('encode', 'encode_into', 'decode')
+
+
+def _attr(obj, name):
+    if name.isidentifier() and not iskeyword(name):
+        return f"{obj}.{name}"
+    return f"getattr({obj}, {name!r})"
+
+
+def _build_function(name, args, lines, env):
+    source = "def {}({}):\n    {}\n".format(name, args, "\n    ".join(lines))
+    exec(source, env)
+    func = env[name]
+    func._canoser_compiled = True
+    return func
+
+
+def _is_class(atype, base):
+    return isinstance(atype, type) and issubclass(atype, base)
+
+
+def _is_struct(atype):
+    from canoser.struct import Struct
+    return _is_class(atype, Struct)
+
+
+def has_own_codec(atype):
+    """
+    Whether a type has encode, encode_into or decode methods of its own, which the
+    generated code calls instead of looking through the type or inlining it.
+    """
+    if _is_class(atype, DelegateT) or _is_struct(atype):
+        return any(atype.overrides(name) for name in CODEC)
+    if _is_class(atype, IntType):
+        return any(getattr(atype, name).__func__.__module__ != IntType.__module__ for name in CODEC)
+    return False
+
+
+def unwrap(atype):
+    while _is_class(atype, DelegateT) and not has_own_codec(atype):
+        atype = atype.dtype()
+    return atype
+
+
+def has_fixed_layout(atype):
+    atype = unwrap(atype)
+    if has_own_codec(atype):
+        return False
+    if atype is BoolT:
+        return True
+    if _is_class(atype, IntType):
+        return hasattr(atype, 'pack_str') or atype.byte_lens == 16
+    if isinstance(atype, BytesT):
+        return atype.fixed_len is not None
+    if isinstance(atype, ArrayT):
+        return atype.fixed_len is not None and (atype.is_bytes or atype.pack_code is not None)
+    if isinstance(atype, TupleT):
+        return all(has_fixed_layout(x) for x in atype.ttypes)
+    if _is_struct(atype):
+        atype.initailize_fields_type()
+        return all(has_fixed_layout(x) for _, x in atype._field_types)
+    return False
+
+
+class Layout:
+    """
+    Pack and unpack code of one run of fixed layout values.
+    """
+
+    def __init__(self, env, prefix):
+        self.env = env
+        self.prefix = prefix
+        self.pack_fmt = ["<"]
+        self.unpack_fmt = ["<"]
+        self.pack_args = []
+        self.enc_lines = []
+        self.dec_lines = []
+        self.index = 0
+        self.names = 0
+
+    def name(self, base):
+        self.names += 1
+        return f"{self.prefix}_{base}{self.names}"
+
+    def const(self, value):
+        name = self.name("const")
+        self.env[name] = value
+        return name
+
+    def take(self, fmt, count=1, unpack_fmt=None):
+        self.pack_fmt.append(fmt)
+        self.unpack_fmt.append(unpack_fmt or fmt)
+        index = self.index
+        self.index += count
+        return index
+
+    def compile(self):
+        packer = struct.Struct("".join(self.pack_fmt))
+        unpacker = struct.Struct("".join(self.unpack_fmt))
+        assert packer.size == unpacker.size
+        return packer, unpacker
+
+    def add(self, atype, expr):  # noqa: C901
+        """
+        Add a value to the run, return the expression that rebuilds it when decoding.
+        """
+        atype = unwrap(atype)
+        if atype is BoolT:
+            self.pack_args.append(expr)
+            i = self.take("?", unpack_fmt="B")
+            self.dec_lines.append(f"if vals[{i}] > 1: raise TypeError('bool should be 0 or 1.')")
+            return f"vals[{i}] == 1"
+        if _is_class(atype, IntType):
+            if hasattr(atype, 'pack_str'):
+                self.pack_args.append(expr)
+                return f"vals[{self.take(atype.pack_str[1:])}]"
+            # 128 bits integers are two 64 bits halves, the high half carries the sign.
+            value = self.name("v")
+            self.enc_lines.append(f"{value} = {expr}")
+            self.pack_args.append(f"{value} & {MASK64}")
+            self.pack_args.append(f"{value} >> 64")
+            i = self.take("Q" + ("q" if atype.signed else "Q"), 2)
+            return f"(vals[{i + 1}] << 64 | vals[{i}])"
+        if isinstance(atype, (BytesT, ArrayT)):
+            return self.add_sequence(atype, expr)
+        if isinstance(atype, TupleT):
+            value = self.name("v")
+            self.enc_lines.append(f"{value} = {expr}")
+            items = [self.add(x, f"{value}[{k}]") for k, x in enumerate(atype.ttypes)]
+            if not items:
+                return "()"
+            return "({},)".format(", ".join(items))
+        if _is_struct(atype):
+            value = self.name("v")
+            self.enc_lines.append(f"{value} = {expr}")
+            items = [(name, self.add(x, _attr(value, name))) for name, x in atype._field_types]
+            cls, ret = self.name("cls"), self.name("ret")
+            self.env[cls] = atype
+            self.dec_lines.append(f"{ret} = {cls}.__new__({cls})")
+            for setter, (name, item) in zip(atype.setters(), items):
+                self.dec_lines.append(f"{self.const(setter)}({ret}, {item})")
+            return ret
+        raise TypeError(f"{atype} has no fixed layout")
+
+    def add_sequence(self, atype, expr):
+        size = atype.fixed_len
+        if atype.encode_len:
+            prefix = encode_uleb128(size)
+            const = self.const(prefix)
+            self.pack_args.append(const)
+            i = self.take(f"{len(prefix)}s")
+            self.dec_lines.append(
+                f"if vals[{i}] != {const}: raise TypeError('length is not equal to predefined value: {size}')")
+        value = self.name("v")
+        self.enc_lines.append(f"{value} = {expr}")
+        self.enc_lines.append(
+            f"if len({value}) != {size}: raise TypeError(f'{{len({value})}} is not equal to predefined value: {size}')")
+        if isinstance(atype, BytesT):
+            self.pack_args.append(f"bytes({value})")
+            return f"vals[{self.take(f'{size}s')}]"
+        if atype.is_bytes:
+            self.pack_args.append(f"bytes({value})")
+            return f"list(vals[{self.take(f'{size}s')}])"
+        self.pack_args.append(f"*{value}")
+        i = self.take(f"{size}{atype.pack_code}", size)
+        return f"list(vals[{i}:{i + size}])"
+
+
+def _runs(cls):
+    """
+    Group the fields of a Struct into runs of fixed layout fields and single other fields.
+    """
+    runs = []
+    for name, mtype in cls._field_types:
+        if has_fixed_layout(mtype):
+            if runs and runs[-1][0]:
+                runs[-1][1].append((name, mtype))
+            else:
+                runs.append((True, [(name, mtype)]))
+        else:
+            runs.append((False, [(name, mtype)]))
+    return runs
+
+
+def compile_encoder(cls):
+    """
+    Generate a straight-line encoder for the exact field list of a Struct subclass.
+    """
+    env = {}
+    lines = ["write = writer.write"]
+    for i, (fixed, fields) in enumerate(_runs(cls)):
+        if fixed:
+            layout = Layout(env, f"run{i}")
+            for name, mtype in fields:
+                layout.add(mtype, _attr("obj", name))
+            env[f"pack{i}"] = layout.compile()[0].pack
+            lines.extend(layout.enc_lines)
+            lines.append("write(pack{}({}))".format(i, ", ".join(layout.pack_args)))
+        else:
+            name, mtype = fields[0]
+            if _is_struct(mtype):
+                mtype.compile()
+            env[f"enc{i}"] = mtype.encode_into
+            lines.append(f"enc{i}(writer, {_attr('obj', name)})")
+    return _build_function("encode_into", "writer, obj", lines, env)
+
+
+def compile_decoder(cls):
+    """
+    Generate a straight-line decoder for the exact field list of a Struct subclass.
+    Decoded values are trusted, they are only checked when the cursor asks to validate.
+    """
+    env = {'cls': cls, 'new': cls.__new__}
+    setters = dict(zip((name for name, _ in cls._fields), cls.setters()))
+    lines = ["validate = cursor.validate", "ret = new(cls)"]
+    for i, (fixed, fields) in enumerate(_runs(cls)):
+        if fixed:
+            layout = Layout(env, f"run{i}")
+            items = [(name, layout.add(mtype, _attr("obj", name))) for name, mtype in fields]
+            env[f"unpacker{i}"] = layout.compile()[1]
+            lines.append(f"vals = cursor.read_struct(unpacker{i})")
+            lines.extend(layout.dec_lines)
+            for name, item in items:
+                lines.append(f"{layout.const(setters[name])}(ret, {item})")
+        else:
+            name, mtype = fields[0]
+            if _is_struct(mtype):
+                mtype.compile()
+            env[f"dec{i}"] = mtype.decode
+            env[f"check{i}"] = mtype.check_value
+            lines.append(f"value = dec{i}(cursor)")
+            env[f"set{i}"] = setters[name]
+            lines.append(f"if validate: check{i}(value)")
+            lines.append(f"set{i}(ret, value)")
+    lines.append("return ret")
+    return _build_function("decode", "cursor", lines, env)
@@ -1,31 +1,111 @@
+from canoser.errors import BufferUnderflowError
+from canoser.uleb128 import decode_uleb128
+import struct
+
+
+def _underflow(end, buffer_len):
+    return BufferUnderflowError("{} exceed buffer size: {}".format(end, buffer_len), end - buffer_len)
+
+
+def _reader(fmt):
+    packer = struct.Struct(fmt)
+    unpack_from = packer.unpack_from
+    size = packer.size
+
+    def read(self):
+        offset = self.offset
+        end = offset + size
+        if end > self.buffer_len:
+            raise _underflow(end, self.buffer_len)
+        self.offset = end
+        return unpack_from(self.buffer, offset)[0]
+    return read
+
+
+def _reader128(fmt):
+    unpack_from = struct.Struct(fmt).unpack_from
+
+    def read(self):
+        offset = self.offset
+        end = offset + 16
+        if end > self.buffer_len:
+            raise _underflow(end, self.buffer_len)
+        self.offset = end
+        low, high = unpack_from(self.buffer, offset)
+        return (high << 64) | low
+    return read
+
 
 class Cursor:
-    def __init__(self, buffer, offset=0):
+    def __init__(self, buffer, offset=0, zero_copy=False, views=False, validate=False):
+        """
+        With `zero_copy`, any buffer-protocol object (bytes, bytearray, memoryview, mmap)
+        is wrapped in a memoryview instead of being copied. With `views`, BytesT and
+        ByteArrayT values decode to memoryview slices of that buffer as well.
+        With `validate`, decoded values are type checked again as if they were assigned.
+        """
         self.buffer = buffer
+        self.validate = validate
+        self.zero_copy = zero_copy or views
+        self.views = views
         if isinstance(buffer, list):
             self.buffer = bytes(buffer)
-        if isinstance(buffer, bytearray):
+        elif self.zero_copy:
+            view = memoryview(buffer)
+            if view.format != 'B' or view.ndim != 1:
+                view = view.cast('B')
+            self.buffer = view
+        elif isinstance(buffer, bytearray):
             self.buffer = bytes(buffer)
         self.offset = offset
         self.buffer_len = len(self.buffer)
 
+    def reset(self, buffer, offset=0):
+        """
+        Point the cursor at another buffer, keeping its options.
+        """
+        self.__init__(buffer, offset, self.zero_copy, self.views, self.validate)
+
     def read_bytes(self, size):
         end = self.offset + size
         if end > self.buffer_len:
-            raise IOError("{} exceed buffer size: {}".format(end, self.buffer_len))
+            raise _underflow(end, self.buffer_len)
         ret = self.buffer[self.offset:end]
         self.offset = end
+        if self.zero_copy:
+            return ret.tobytes()
+        return ret
+
+    def read_view(self, size):
+        """
+        Read `size` bytes as a memoryview into the underlying buffer, without copying.
+        """
+        end = self.offset + size
+        if end > self.buffer_len:
+            raise _underflow(end, self.buffer_len)
+        ret = memoryview(self.buffer)[self.offset:end]
+        self.offset = end
         return ret
 
+    def skip(self, size):
+        end = self.offset + size
+        if end > self.buffer_len:
+            raise _underflow(end, self.buffer_len)
+        self.offset = end
+
     def read_to_end(self):
         ret = self.buffer[self.offset:]
         self.offset = self.buffer_len
+        if self.zero_copy:
+            return ret.tobytes()
         return ret
 
     def peek_bytes(self, size):
         end = self.offset + size
         if end > self.buffer_len:
-            raise IOError("{} exceed buffer size: {}".format(end, self.buffer_len))
+            raise _underflow(end, self.buffer_len)
+        if self.zero_copy:
+            return self.buffer[self.offset:end].tobytes()
         return self.buffer[self.offset:end]
 
     def is_finished(self):
@@ -35,5 +115,60 @@ class Cursor:
         return self.offset
 
     def read_u8(self):
-        arr = self.read_bytes(1)
-        return int(arr[0])
+        offset = self.offset
+        if offset >= self.buffer_len:
+            raise _underflow(offset + 1, self.buffer_len)
+        self.offset = offset + 1
+        return self.buffer[offset]
+
+    def read_struct(self, packer):
+        """
+        Unpack the next values with a precompiled struct.Struct, return a tuple.
+        """
+        offset = self.offset
+        end = offset + packer.size
+        if end > self.buffer_len:
+            raise _underflow(end, self.buffer_len)
+        self.offset = end
+        return packer.unpack_from(self.buffer, offset)
+
+    def read_array(self, fmt, size):
+        """
+        Unpack the next `size` bytes with one struct format such as '<8Q', return a tuple.
+        """
+        offset = self.offset
+        end = offset + size
+        if end > self.buffer_len:
+            raise _underflow(end, self.buffer_len)
+        self.offset = end
+        return struct.unpack_from(fmt, self.buffer, offset)
+
+    def read_uleb128(self):
+        offset = self.offset
+        if offset < self.buffer_len:
+            byte = self.buffer[offset]
+            if byte < 0x80:
+                self.offset = offset + 1
+                return byte
+        value, self.offset = decode_uleb128(self.buffer, offset, self.buffer_len)
+        return value
+
+    def read_bool(self):
+        value = self.read_u8()
+        if value == 0:
+            return False
+        elif value == 1:
+            return True
+        else:
+            raise TypeError("bool should be 0 or 1.")
+
+    read_i8 = _reader("<b")
+    read_i16 = _reader("<h")
+    read_i32 = _reader("<l")
+    read_i64 = _reader("<q")
+    read_u16 = _reader("<H")
+    read_u32 = _reader("<L")
+    read_u64 = _reader("<Q")
+    # 128 bits integers are read as two 64 bits halves, the high half carries the sign.
+    read_i128 = _reader128("<Qq")
+    read_u128 = _reader128("<QQ")
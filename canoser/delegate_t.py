@@ -3,28 +3,71 @@ from canoser.base import Base
 
 
 class DelegateT(Base):
+    """
+    A named alias of another type, such as `Address` for `[Uint8, 32]`.
+
+    The delegate is resolved on first use, then the codec methods the subclass does not
+    override are bound straight to the delegate's, so that the alias is as fast as the
+    delegate itself, including its specialized paths such as `skip`, `read_size` or `view`.
+    """
     delegate_type = 'delegate'
+    _forwarded = ('encode', 'encode_into', 'decode', 'skip', 'fixed_size', 'check_value',
+                  'to_json_serializable', 'read_size', 'view')
 
     @classmethod
     def dtype(cls):
-        return type_mapping(cls.delegate_type)
+        try:
+            return cls.__dict__['_dtype']
+        except KeyError:
+            dtype = type_mapping(cls.delegate_type)
+            cls.bind(dtype)
+            cls._dtype = dtype
+            return dtype
+
+    @classmethod
+    def bind(cls, dtype):
+        bound = []
+        for name in cls._forwarded:
+            method = getattr(dtype, name, None)
+            if method is None or cls.overrides(name):
+                continue
+            setattr(cls, name, method)
+            bound.append(name)
+        cls._bound = tuple(bound)
+
+    @classmethod
+    def overrides(cls, name):
+        for klass in cls.__mro__:
+            if klass is DelegateT:
+                return False
+            if name in klass.__dict__ and name not in klass.__dict__.get('_bound', ()):
+                return True
+        return False
 
     @classmethod
     def encode(cls, value):
         return cls.dtype().encode(value)
 
+    @classmethod
+    def encode_into(cls, writer, value):
+        cls.dtype().encode_into(writer, value)
+
     @classmethod
     def decode(cls, cursor):
         return cls.dtype().decode(cursor)
 
+    @classmethod
+    def skip(cls, cursor):
+        cls.dtype().skip(cursor)
+
+    @classmethod
+    def fixed_size(cls):
+        return cls.dtype().fixed_size()
+
     @classmethod
     def check_value(cls, value):
         cls.dtype().check_value(value)
 
     @classmethod
     def to_json_serializable(cls, value):
-        # TODO: bad smell
-        # if hasattr(cls, "to_json_serializable"):
-        if 'to_json_serializable' in cls.__dict__.keys():
-            return cls.to_json_serializable(value)
         return cls.dtype().to_json_serializable(value)
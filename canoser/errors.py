@@ -0,0 +1,10 @@
+
+class BufferUnderflowError(IOError, ValueError):
+    """
+    The buffer ended before the value being read was complete. `needed` is the number
+    of extra bytes known to be required, at least 1.
+    """
+
+    def __init__(self, message, needed=1):
+        super().__init__(message)
+        self.needed = needed
@@ -0,0 +1,198 @@
+"""
+Resumable decoding of a value whose bytes arrive in chunks.
+
+Each type is decoded by a generator that yields the number of bytes it needs next and
+is sent exactly that many bytes back. Nested Struct, ArrayT, MapT, TupleT, RustEnum and
+RustOptional values are decoded by nested generators, so the progress through all the
+enclosing frames is kept while waiting for more data, and no byte is decoded twice.
+"""
+from canoser.array_t import ArrayT
+from canoser.bytes_t import BytesT, ByteArrayT
+from canoser.compiler import has_own_codec, unwrap, _is_class, _is_struct
+from canoser.cursor import Cursor
+from canoser.delegate_t import DelegateT
+from canoser.map_t import MapT, _out_of_order
+from canoser.rust_enum import RustEnum
+from canoser.rust_optional import RustOptional
+from canoser.str_t import StrT
+from canoser.tuple_t import TupleT
+from canoser.types import type_mapping
+from canoser.uleb128 import decode_uleb128
+
+
+def read_uleb128():
+    raw = b''
+    while True:
+        raw += yield 1
+        # a Uint32 takes 5 bytes at most, decode_uleb128 rejects longer ones
+        if raw[-1] < 0x80 or len(raw) == 5:
+            return decode_uleb128(raw, 0, len(raw))[0], raw
+
+
+def decode_steps(atype, validate=False):  # noqa: C901
+    """
+    Return a generator decoding a value of atype, see IncrementalDecoder.
+    """
+    atype = unwrap(type_mapping(atype))
+    size = atype.fixed_size()
+    if size is not None:
+        data = yield size
+        return atype.decode(Cursor(data, validate=validate))
+    if _is_struct(atype) or _is_class(atype, DelegateT):
+        if has_own_codec(atype):
+            # the declared layout frames the bytes, the type's own decode reads them
+            steps = _field_steps(atype, validate) if _is_struct(atype) else decode_steps(atype.dtype(), validate)
+            _, raw = yield from _recorded(steps)
+            return atype.decode(Cursor(raw, validate=validate))
+    if atype is StrT or isinstance(atype, (BytesT, ByteArrayT)):
+        return (yield from _decode_sized(atype, 1, validate))
+    if isinstance(atype, ArrayT):
+        if atype.encode_len and atype.atype.fixed_size() is not None:
+            return (yield from _decode_sized(atype, atype.atype.fixed_size(), validate))
+        size = atype.fixed_len
+        if atype.encode_len:
+            size, _ = yield from read_uleb128()
+            if atype.fixed_len is not None and size != atype.fixed_len:
+                raise TypeError(f"{size} is not equal to predefined value: {atype.fixed_len}")
+        ret = []
+        for _ in range(size):
+            ret.append((yield from decode_steps(atype.atype, validate)))
+        return ret
+    if isinstance(atype, MapT):
+        size, _ = yield from read_uleb128()
+        ret = {}
+        previous = None
+        for _ in range(size):
+            k, name = yield from _recorded(decode_steps(atype.ktype, validate))
+            if previous is not None and name <= previous:
+                raise _out_of_order(name, previous)
+            previous = name
+            ret[atype.hashable_key(k)] = yield from decode_steps(atype.vtype, validate)
+        return ret
+    if isinstance(atype, TupleT):
+        ret = []
+        for ttype in atype.ttypes:
+            ret.append((yield from decode_steps(ttype, validate)))
+        return tuple(ret)
+    if _is_struct(atype):
+        return (yield from _field_steps(atype, validate))
+    if _is_class(atype, RustEnum):
+        index, _ = yield from read_uleb128()
+        value_type = atype.variant_type(index)
+        value = None
+        if value_type is not None:
+            value = yield from decode_steps(value_type, validate)
+        if validate:
+            return atype.new_with_index_value(index, value)
+        return atype.new_trusted(index, value)
+    if _is_class(atype, RustOptional):
+        exist = yield 1
+        if exist[0] > 1:
+            raise TypeError("bool should be 0 or 1.")
+        value = None
+        if exist[0]:
+            value = yield from decode_steps(atype.resolved_type(), validate)
+        if validate:
+            return atype(value)
+        return atype.new_trusted(value)
+    raise TypeError(f"{atype} can't be decoded incrementally")
+
+
+def _field_steps(atype, validate):
+    """
+    Decode the fields of a struct one after the other.
+    """
+    atype.initailize_fields_type()
+    ret = atype.__new__(atype)
+    for setter, (name, mtype) in zip(atype.setters(), atype._field_types):
+        value = yield from decode_steps(mtype, validate)
+        if validate:
+            mtype.check_value(value)
+        setter(ret, value)
+    return ret
+
+
+def _recorded(steps):
+    """
+    Run the steps of a value, return the value and the bytes it was decoded from.
+    """
+    raw = []
+    try:
+        request = next(steps)
+        while True:
+            data = yield request
+            raw.append(data)
+            request = steps.send(data)
+    except StopIteration as stop:
+        return stop.value, b''.join(raw)
+
+
+def _decode_sized(atype, item_size, validate):
+    """
+    Decode a sequence whose length prefix gives the size of the rest, in one step.
+    """
+    size, raw = yield from read_uleb128()
+    data = yield size * item_size
+    return atype.decode(Cursor(raw + data, validate=validate))
+
+
+class IncrementalDecoder:
+    """
+    Decode one value of atype from chunks of bytes, such as network reads:
+
+        decoder = IncrementalDecoder(MyStruct)
+        while decoder.feed(sock.recv(4096)):
+            pass
+        obj = decoder.value
+
+    feed returns the number of bytes still needed at least, 0 once the value is
+    decoded. The bytes fed after the end of the value are kept in unused_data.
+    """
+
+    def __init__(self, atype, validate=False):
+        self.start(decode_steps(atype, validate))
+
+    @classmethod
+    def of_steps(cls, steps):
+        """
+        Drive another generator of steps, such as read_uleb128().
+        """
+        ret = cls.__new__(cls)
+        ret.start(steps)
+        return ret
+
+    def start(self, steps):
+        self.steps = steps
+        self.pending = bytearray()
+        self.done = False
+        self.value = None
+        self.request = 0
+        self.advance(None)
+
+    @property
+    def needed(self):
+        if self.done:
+            return 0
+        return self.request - len(self.pending)
+
+    @property
+    def unused_data(self):
+        if not self.done:
+            return b''
+        return bytes(self.pending)
+
+    def advance(self, data):
+        try:
+            self.request = self.steps.send(data)
+        except StopIteration as stop:
+            self.done = True
+            self.value = stop.value
+
+    def feed(self, data):
+        pending = self.pending
+        pending += data
+        while not self.done and len(pending) >= self.request:
+            data = bytes(pending[:self.request])
+            del pending[:self.request]
+            self.advance(data)
+        return self.needed
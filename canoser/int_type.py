@@ -1,5 +1,6 @@
 from random import randint
 from canoser.base import Base
+from canoser.uleb128 import encode_uleb128
 from struct import pack, unpack
 from_bytes = int.from_bytes
 
@@ -10,10 +11,22 @@ class IntType(Base):
     def to_json_serializable(cls, value):
         return value
 
+    @classmethod
+    def fixed_size(cls):
+        return cls.byte_lens
+
+    @classmethod
+    def skip(cls, cursor):
+        cursor.skip(cls.byte_lens)
+
     @classmethod
     def encode(cls, value):
         return pack(cls.pack_str, value)
 
+    @classmethod
+    def encode_into(cls, writer, value):
+        writer.write(pack(cls.pack_str, value))
+
     @classmethod
     def encode_slow(cls, value):
         return value.to_bytes(cls.byte_lens, byteorder="little", signed=cls.signed)
@@ -28,8 +41,11 @@ class IntType(Base):
 
     @classmethod
     def decode(cls, cursor):
-        bytes = cursor.read_bytes(cls.byte_lens)
-        return cls.decode_bytes(bytes)
+        read_method = getattr(cls, 'read_method', None)
+        if read_method is None:
+            # a custom int type without a dedicated Cursor reader
+            return cls.decode_bytes(cursor.read_bytes(cls.byte_lens))
+        return getattr(cursor, read_method)()
 
     @classmethod
     def int_unsafe(cls, s):
@@ -88,6 +104,7 @@ class IntType(Base):
 
 class Int8(IntType):
     pack_str = "<b"
+    read_method = "read_i8"
     byte_lens = 1
     max_value = 127
     min_value = -128
@@ -96,6 +113,7 @@ class Int8(IntType):
 
 class Int16(IntType):
     pack_str = "<h"
+    read_method = "read_i16"
     byte_lens = 2
     max_value = 32767
     min_value = -32768
@@ -104,6 +122,7 @@ class Int16(IntType):
 
 class Int32(IntType):
     pack_str = "<l"
+    read_method = "read_i32"
     byte_lens = 4
     max_value = 2147483647
     min_value = -2147483648
@@ -112,6 +131,7 @@ class Int32(IntType):
 
 class Int64(IntType):
     pack_str = "<q"
+    read_method = "read_i64"
     byte_lens = 8
     max_value = 9223372036854775807
     min_value = -9223372036854775808
@@ -120,6 +140,7 @@ class Int64(IntType):
 
 class Uint8(IntType):
     pack_str = "<B"
+    read_method = "read_u8"
     byte_lens = 1
     max_value = 255
     min_value = 0
@@ -128,6 +149,7 @@ class Uint8(IntType):
 
 class Uint16(IntType):
     pack_str = "<H"
+    read_method = "read_u16"
     byte_lens = 2
     max_value = 65535
     min_value = 0
@@ -136,6 +158,7 @@ class Uint16(IntType):
 
 class Uint32(IntType):
     pack_str = "<L"
+    read_method = "read_u32"
     byte_lens = 4
     max_value = 4294967295
     min_value = 0
@@ -143,36 +166,16 @@ class Uint32(IntType):
 
     @classmethod
     def serialize_uint32_as_uleb128(cls, value):
-        ret = bytearray()
-        while value >= 0x80:
-            # Write 7 (lowest) bits of data and set the 8th bit to 1.
-            byte = (value & 0x7f)
-            ret.append(byte | 0x80)
-            value >>= 7
-
-        # Write the remaining bits of data and set the highest bit to 0.
-        ret.append(value)
-        return bytes(ret)
+        return encode_uleb128(value)
 
     @classmethod
     def parse_uint32_from_uleb128(cls, cursor):
-        max_shift = 28
-        value = 0
-        shift = 0
-        while not cursor.is_finished():
-            byte = cursor.read_u8()
-            val = byte & 0x7f
-            value |= (val << shift)
-            if val == byte:
-                return value
-            shift += 7
-            if shift > max_shift:
-                break
-        raise ValueError("invalid ULEB128 representation for Uint32")
+        return cursor.read_uleb128()
 
 
 class Uint64(IntType):
     pack_str = "<Q"
+    read_method = "read_u64"
     byte_lens = 8
     max_value = 18446744073709551615
     min_value = 0
@@ -180,6 +183,7 @@ class Uint64(IntType):
 
 
 class Int128(IntType):
+    read_method = "read_i128"
     byte_lens = 16
     max_value = 170141183460469231731687303715884105727
     min_value = -170141183460469231731687303715884105728
@@ -189,8 +193,13 @@ class Int128(IntType):
     def encode(cls, value):
         return value.to_bytes(16, byteorder="little", signed=True)
 
+    @classmethod
+    def encode_into(cls, writer, value):
+        writer.write(value.to_bytes(16, byteorder="little", signed=True))
+
 
 class Uint128(IntType):
+    read_method = "read_u128"
     byte_lens = 16
     max_value = 340282366920938463463374607431768211455
     min_value = 0
@@ -199,3 +208,7 @@ class Uint128(IntType):
     @classmethod
     def encode(cls, value):
         return value.to_bytes(16, byteorder="little", signed=False)
+
+    @classmethod
+    def encode_into(cls, writer, value):
+        writer.write(value.to_bytes(16, byteorder="little", signed=False))
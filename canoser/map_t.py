@@ -1,40 +1,148 @@
 from canoser.base import Base
-from canoser.int_type import Uint32
+from canoser.array_t import ArrayT
+from canoser.bytes_t import BytesT
+from canoser.writer import Writer
+from operator import itemgetter
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+def _out_of_order(name, previous):
+    return TypeError(f"map keys are not in canonical order: {name.hex()} after {previous.hex()}")
 
 
 class MapT(Base):
+    """
+    LCS map, its entries are ordered by the bytes of their encoded keys.
+
+    The encoded keys of the maps serialized or decoded recently are kept in a bounded
+    LRU cache of the map type, so that serializing them again does not encode their keys
+    again. The cache starts with room for key_cache_size keys and grows to the largest
+    map seen, up to max_key_cache_size. A larger map serialized often is better kept in
+    a CanonicalMap, which holds the encoded keys along with its entries.
+    """
+    key_cache_size = 1024
+    max_key_cache_size = 1 << 20
 
     def __init__(self, ktype, vtype):
         self.ktype = ktype
         self.vtype = vtype
+        self._encoded_keys = OrderedDict()
+        self._key_cache_capacity = self.key_cache_size
+        self._key_decoder = None
 
     def encode(self, kvs):
-        output = b""
-        output += Uint32.serialize_uint32_as_uleb128(len(kvs))
-        odict = {}
-        for k, v in kvs.items():
-            odict[self.ktype.encode(k)] = self.vtype.encode(v)
-        for name in sorted(odict.keys()):
-            output += name
-            output += odict[name]
-        return output
+        writer = Writer()
+        self.encode_into(writer, kvs)
+        return writer.getvalue()
+
+    def encode_into(self, writer, kvs):
+        writer.write_uleb128(len(kvs))
+        if hasattr(kvs, 'encoded_items') and kvs.ktype == self.ktype:
+            # a CanonicalMap is already in canonical order
+            entries = kvs.encoded_items()
+        else:
+            # a map larger than the cache would only evict the keys it just cached
+            encoded_key = self.encoded_key if self.fits_key_cache(len(kvs)) else self.ktype.encode
+            entries = sorted([(encoded_key(k), v) for k, v in kvs.items()], key=itemgetter(0))
+        vencode_into = self.vtype.encode_into
+        for name, value in entries:
+            writer.write(name)
+            vencode_into(writer, value)
+
+    def encoded_key(self, k):
+        cache = self._encoded_keys
+        try:
+            name = cache[k]
+        except KeyError:
+            name = self.ktype.encode(k)
+            self.cache_key(k, name)
+            return name
+        try:
+            cache.move_to_end(k)
+        except KeyError:
+            # evicted meanwhile by another thread
+            pass
+        return name
+
+    def fits_key_cache(self, size):
+        """
+        Grow the key cache to hold the keys of a map of `size` entries if needed, return
+        False if it can't.
+        """
+        if size > self._key_cache_capacity:
+            if size > self.max_key_cache_size:
+                return False
+            self._key_cache_capacity = size
+        return True
+
+    def cache_key(self, k, name):
+        cache = self._encoded_keys
+        cache[k] = name
+        if len(cache) > self._key_cache_capacity:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                pass
+
+    def key_decoder(self):
+        """
+        Decode a key into a dict key, Vec<u8> keys are read straight into bytes.
+        """
+        if self._key_decoder is None:
+            from canoser.compiler import unwrap
+            ktype = unwrap(self.ktype)
+            if isinstance(ktype, ArrayT) and ktype.is_bytes:
+                read_size = ktype.read_size
+                self._key_decoder = lambda cursor: cursor.read_bytes(read_size(cursor))
+            elif isinstance(ktype, (ArrayT, BytesT)):
+                kdecode = self.ktype.decode
+                hashable_key = self.hashable_key
+                self._key_decoder = lambda cursor: hashable_key(kdecode(cursor))
+            else:
+                self._key_decoder = self.ktype.decode
+        return self._key_decoder
 
     def decode(self, cursor):
         kvs = {}
-        size = Uint32.parse_uint32_from_uleb128(cursor)
+        size = cursor.read_uleb128()
+        kdecode = self.key_decoder()
+        vdecode = self.vtype.decode
+        buffer = cursor.buffer
+        cache = self._encoded_keys if self.fits_key_cache(size) else None
+        previous = None
         for _ in range(size):
-            k = self.ktype.decode(cursor)
-            v = self.vtype.decode(cursor)
-            if isinstance(k, list) and isinstance(k[0], int):
-                # python doesn't support list as key in dict, so we change list to bytes
-                kvs[bytes(k)] = v
-            else:
-                kvs[k] = v
-        # TODO: check the key order of kvs, because lcs has order when serialize map.
+            start = cursor.offset
+            k = kdecode(cursor)
+            name = bytes(buffer[start:cursor.offset])
+            # canonical maps are strictly ordered by encoded keys, which also rules out duplicates
+            if previous is not None and name <= previous:
+                raise _out_of_order(name, previous)
+            previous = name
+            kvs[k] = vdecode(cursor)
+            if cache is not None and k not in cache:
+                self.cache_key(k, name)
         return kvs
 
+    def skip(self, cursor):
+        kskip = self.ktype.skip
+        vskip = self.vtype.skip
+        for _ in range(cursor.read_uleb128()):
+            kskip(cursor)
+            vskip(cursor)
+
+    @staticmethod
+    def hashable_key(k):
+        if isinstance(k, list) and isinstance(k[0], int):
+            # python doesn't support list as key in dict, so we change list to bytes
+            return bytes(k)
+        if isinstance(k, memoryview):
+            # views into a mutable buffer are not hashable
+            return k.tobytes()
+        return k
+
     def check_value(self, kvs):
-        if not isinstance(kvs, dict):
+        if not isinstance(kvs, Mapping):
             raise TypeError(f"{kvs} is not a dict.")
         for k, v in kvs.items():
             if isinstance(self.ktype, list) or \
@@ -46,10 +154,15 @@ class MapT(Base):
             self.vtype.check_value(v)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, MapT):
             return False
         return self.ktype == other.ktype and self.vtype == other.vtype
 
+    def __hash__(self):
+        return hash((MapT, self.ktype, self.vtype))
+
     def to_json_serializable(cls, obj):
         amap = {}
         for k, v in obj.items():
@@ -0,0 +1,60 @@
+"""
+Decoding of large batches of records in a process pool.
+
+The batch is copied once into shared memory, the workers decode their share of the
+records straight from it and send the decoded values back, pickled compactly.
+"""
+from canoser.cursor import Cursor
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+import os
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+
+def _decode_records(atype, name, offsets, validate):
+    memory = shared_memory.SharedMemory(name=name)
+    cursor = Cursor(memory.buf, zero_copy=True, validate=validate)
+    try:
+        ret = []
+        decode = atype.decode
+        for i in range(len(offsets) - 1):
+            cursor.offset = offsets[i]
+            ret.append(decode(cursor))
+            if cursor.offset != offsets[i + 1]:
+                raise IOError("record ends at {}, not {}".format(cursor.offset, offsets[i + 1]))
+        return ret
+    finally:
+        # the shared memory can't be closed while the cursor still exports its buffer
+        cursor.buffer.release()
+        memory.close()
+
+
+def parallel_deserialize_many(atype, buffer, offsets, workers=None, validate=False, batches_per_worker=4):
+    """
+    Decode the records buffer[offsets[i]:offsets[i+1]], as returned by serialize_many,
+    in a pool of `workers` processes. Falls back to deserialize_many in this process
+    when shared memory is not available.
+    """
+    count = len(offsets) - 1
+    if shared_memory is None or count <= 0 or workers == 1:
+        return atype.deserialize_many(buffer, offsets, validate=validate)
+    workers = workers or os.cpu_count()
+    step = -(-count // (workers * batches_per_worker))
+    offsets = array('Q', offsets)
+    memory = shared_memory.SharedMemory(create=True, size=max(len(buffer), 1))
+    try:
+        memory.buf[:len(buffer)] = buffer
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(_decode_records, atype, memory.name, offsets[i:i + step + 1], validate)
+                       for i in range(0, count, step)]
+            ret = []
+            for future in futures:
+                ret.extend(future.result())
+        return ret
+    finally:
+        memory.close()
+        memory.unlink()
@@ -1,46 +1,129 @@
 from canoser.base import Base
 from canoser.types import type_mapping
-from canoser.int_type import Uint32
-from canoser.struct import TypedProperty
+from canoser.struct import TypedProperty, StructMeta
+from canoser.writer import Writer
 import json
 
-# TODO: how to support discontinuous index in enum
 
+class _Predicate(property):
+    """
+    A predicate generated for a variant, which the predicates of a subclass replace.
+    """
 
-class RustEnum(Base):
+
+def _predicate(index):
+    return _Predicate(lambda self: self._index == index, doc=f"whether the variant index is {index}")
+
+
+class RustEnum(Base, metaclass=StructMeta):
+    """
+    Each entry of `_enums` is (name, datatype), or (name, datatype, index) for a variant
+    whose index is not its position, as with discontinuous discriminants in rust.
+    """
+    __slots__ = ('_index', 'value')
     _enums = []
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # predicates such as `arg.U64`, unless the name is already used by something else
+        for position, entry in enumerate(cls.__dict__.get('_enums', ())):
+            if entry[0] in ('value', 'value_type', '_index'):
+                continue
+            if not hasattr(cls, entry[0]) or isinstance(getattr(cls, entry[0]), _Predicate):
+                setattr(cls, entry[0], _predicate(entry[2] if len(entry) > 2 else position))
+
+    @classmethod
+    def build_tables(cls):
+        enum_types = {}
+        enum_names = {}
+        name_index = {}
+        for position, entry in enumerate(cls._enums):
+            name, datatype = entry[0], entry[1]
+            index = entry[2] if len(entry) > 2 else position
+            if index in enum_types or name in name_index:
+                raise TypeError(f"duplicated variant {name}:{index} in enum {cls}")
+            enum_types[index] = type_mapping(datatype)
+            enum_names[index] = name
+            name_index[name] = index
+        cls._enum_names = enum_names
+        cls._name_index = name_index
+        cls._enum_types = enum_types
+
+    @classmethod
+    def enum_types(cls):
+        """
+        The resolved canoser type of each variant, by variant index.
+        """
+        try:
+            return cls.__dict__['_enum_types']
+        except KeyError:
+            cls.build_tables()
+            return cls._enum_types
+
+    @classmethod
+    def variant_type(cls, index):
+        try:
+            return cls.enum_types()[index]
+        except KeyError:
+            raise TypeError(f"index{index} not in enum {cls}")
+
     @classmethod
     def get_index(cls, name):
-        for index, (ename, _) in enumerate(cls._enums):
-            if ename == name:
-                return index
-        raise TypeError(f"name:{name} not in enum {cls}")
+        cls.enum_types()
+        try:
+            return cls._name_index[name]
+        except KeyError:
+            raise TypeError(f"name:{name} not in enum {cls}")
+
+    @classmethod
+    def unit(cls, index):
+        """
+        The instance shared by the values of a variant without data, it can't be modified.
+        """
+        units = cls.__dict__.get('_units')
+        if units is None:
+            units = cls._units = {}
+        try:
+            return units[index]
+        except KeyError:
+            ret = units[index] = cls.__new__(cls)
+            object.__setattr__(ret, '_index', index)
+            object.__setattr__(ret, 'value', None)
+            return ret
 
     @classmethod
     def new_with_index_value(cls, index, value):
         if not cls._enums:
             raise TypeError(f'{cls} has no _enums defined.')
-        if index < 0 or index >= len(cls._enums):
-            raise TypeError(f"index{index} out of bound:0-{len(cls._enums)-1}")
-        _name, datatype = cls._enums[index]
+        if cls.variant_type(index) is None and value is None:
+            return cls.unit(index)
         ret = cls.__new__(cls)
-        ret._init_with_index_value(index, value, datatype)
+        ret._init_with_index_value(index, value)
         return ret
 
-    def _init_with_index_value(self, index, value, datatype):
-        self._index = index
-        self.value_type = type_mapping(datatype)
+    @classmethod
+    def new_trusted(cls, index, value):
+        """
+        Build an enum from a decoded index and value without checking them again.
+        """
+        if value is None:
+            return cls.unit(index)
+        ret = cls.__new__(cls)
+        object.__setattr__(ret, '_index', index)
+        object.__setattr__(ret, 'value', value)
+        return ret
+
+    def _init_with_index_value(self, index, value):
+        object.__setattr__(self, '_index', index)
         self.value = value
 
     def __init__(self, name, value=None):
         if not self.__class__._enums:
             raise TypeError(f'{self.__class__} has no _enums defined.')
-        index = self.__class__.get_index(name)
-        _name, datatype = self._enums[index]
-        if name != _name:
-            raise AssertionError(f"{name} != {_name}")
-        self._init_with_index_value(index, value, datatype)
+        self._init_with_index_value(self.__class__.get_index(name), value)
+
+    def __reduce__(self):
+        return self.__class__.new_trusted, (self._index, self.value)
 
     # __getattr__ only gets called for attributes that don't actually exist.
     # If you set an attribute directly, referencing that attribute will retrieve it without calling __getattr__.
@@ -56,9 +139,7 @@ class RustEnum(Base):
     def __setattr__(self, name, value):
         if name == "value":
             TypedProperty.check_type(self.value_type, value)
-            self.__dict__[name] = value
-        elif name == "_index" or name == "value_type":
-            self.__dict__[name] = value
+            object.__setattr__(self, name, value)
         else:
             raise TypeError(f"{name} not allowed to modify in {self}.")
 
@@ -66,27 +147,44 @@ class RustEnum(Base):
     def index(self):
         return self._index
 
+    @property
+    def value_type(self):
+        return self.__class__.enum_types()[self._index]
+
     @property
     def enum_name(self):
-        name, _ = self.__class__._enums[self._index]
-        return name
+        self.__class__.enum_types()
+        return self.__class__._enum_names[self._index]
 
     @classmethod
     def encode(cls, enum):
-        ret = Uint32.serialize_uint32_as_uleb128(enum.index)
+        writer = Writer()
+        cls.encode_into(writer, enum)
+        return writer.getvalue()
+
+    @classmethod
+    def encode_into(cls, writer, enum):
+        writer.write_uleb128(enum.index)
         if enum.value_type is not None:
-            ret += enum.value_type.encode(enum.value)
-        return ret
+            enum.value_type.encode_into(writer, enum.value)
 
     @classmethod
     def decode(cls, cursor):
-        index = Uint32.parse_uint32_from_uleb128(cursor)
-        _name, datatype = cls._enums[index]
-        if datatype is not None:
-            value = type_mapping(datatype).decode(cursor)
+        index = cursor.read_uleb128()
+        value_type = cls.variant_type(index)
+        value = None
+        if value_type is not None:
+            value = value_type.decode(cursor)
+        if cursor.validate:
             return cls.new_with_index_value(index, value)
-        else:
-            return cls.new_with_index_value(index, None)
+        return cls.new_trusted(index, value)
+
+    @classmethod
+    def skip(cls, cursor):
+        index = cursor.read_uleb128()
+        value_type = cls.variant_type(index)
+        if value_type is not None:
+            value_type.skip(cursor)
 
     @classmethod
     def check_value(cls, value):
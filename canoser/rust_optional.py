@@ -1,43 +1,97 @@
 from canoser.base import Base
 from canoser.bool_t import BoolT
-from canoser.struct import TypedProperty
+from canoser.struct import TypedProperty, StructMeta
 from canoser.types import type_mapping
+from canoser.writer import Writer
 
 
-class RustOptional(Base):
+class RustOptional(Base, metaclass=StructMeta):
+    __slots__ = ('value',)
     _type = None
 
+    @classmethod
+    def resolved_type(cls):
+        try:
+            return cls.__dict__['_resolved_type']
+        except KeyError:
+            cls._resolved_type = type_mapping(cls._type)
+            return cls._resolved_type
+
+    @classmethod
+    def none(cls):
+        """
+        The empty optional shared by decoded values, it can't be modified.
+        """
+        try:
+            return cls.__dict__['_none']
+        except KeyError:
+            ret = cls._none = cls.__new__(cls)
+            object.__setattr__(ret, 'value', None)
+            return ret
+
     def __init__(self, value=None):
         if not self.__class__._type:
             raise TypeError(f'{self.__class__} has no _type defined.')
-        self.__dict__["value_type"] = type_mapping(self.__class__._type)
         self.value = value
 
+    @classmethod
+    def new_trusted(cls, value):
+        """
+        Build an optional from a decoded value without checking it again.
+        """
+        if value is None:
+            return cls.none()
+        ret = cls.__new__(cls)
+        object.__setattr__(ret, 'value', value)
+        return ret
+
+    @property
+    def value_type(self):
+        return self.__class__.resolved_type()
+
     def __setattr__(self, name, value):
         if name == "value":
+            if self is self.__class__.__dict__.get('_none'):
+                raise TypeError(f"the shared empty {self.__class__} can't be modified.")
             if value is not None:
                 TypedProperty.check_type(self.value_type, value)
-            self.__dict__[name] = value
+            object.__setattr__(self, name, value)
         else:
             raise TypeError(f"{name} not allowed to modify in {self}.")
 
+    def __reduce__(self):
+        if self is self.__class__.__dict__.get('_none'):
+            return self.__class__.none, ()
+        return self.__class__, (self.value,)
+
     @classmethod
     def encode(cls, optional):
+        writer = Writer()
+        cls.encode_into(writer, optional)
+        return writer.getvalue()
+
+    @classmethod
+    def encode_into(cls, writer, optional):
         if optional.value is not None:
-            ret = BoolT.encode(True)
-            ret += optional.value_type.encode(optional.value)
-            return ret
+            BoolT.encode_into(writer, True)
+            optional.value_type.encode_into(writer, optional.value)
         else:
-            return BoolT.encode(False)
+            BoolT.encode_into(writer, False)
 
     @classmethod
     def decode(cls, cursor):
         exist = BoolT.decode(cursor)
+        value = None
         if exist:
-            value = cls._type.decode(cursor)
+            value = cls.resolved_type().decode(cursor)
+        if cursor.validate and value is not None:
             return cls(value)
-        else:
-            return cls()
+        return cls.new_trusted(value)
+
+    @classmethod
+    def skip(cls, cursor):
+        if cursor.read_bool():
+            cls.resolved_type().skip(cursor)
 
     @classmethod
     def check_value(cls, value):
@@ -0,0 +1,178 @@
+"""
+Append-only files of serialized records, read back through mmap.
+
+A store at `path` is made of three files:
+
+    path        the records, back to back
+    path.idx    the end offset of each record, as little endian Uint64
+    path.keys   optionally, the key and the position of keyed records, LCS encoded
+
+The index entry of a record is written after the record itself, so a record that was
+only partly appended is ignored by the readers.
+"""
+from canoser.cursor import Cursor
+from canoser.errors import BufferUnderflowError
+from canoser.int_type import Uint64
+from canoser.map_t import MapT
+from canoser.types import type_mapping
+from canoser.writer import Writer
+from array import array
+import mmap
+import os
+import sys
+
+
+class RecordWriter:
+
+    """
+    Append records, optionally with a key, to the store at `path`.
+    """
+
+    def __init__(self, path, atype, key_type=bytes):
+        self.atype = type_mapping(atype)
+        self.key_type = type_mapping(key_type)
+        self.path = path
+        self.count, _ = self.recover(path)
+        self.data = open(path, 'ab')
+        self.index = open(path + '.idx', 'ab')
+        self.keys = None
+        self.writer = Writer()
+
+    @staticmethod
+    def recover(path):
+        """
+        Drop what an interrupted append left after the last indexed record, return the
+        number of records and the end of the last one.
+        """
+        count, end = 0, 0
+        if os.path.exists(path + '.idx'):
+            count = os.path.getsize(path + '.idx') // 8
+            os.truncate(path + '.idx', count * 8)
+        if count:
+            with open(path + '.idx', 'rb') as fp:
+                fp.seek(count * 8 - 8)
+                end = int.from_bytes(fp.read(8), 'little')
+        if os.path.exists(path) and os.path.getsize(path) > end:
+            os.truncate(path, end)
+        return count, end
+
+    def append(self, obj, key=None):
+        """
+        Append a record, return its position.
+        """
+        writer = self.writer
+        del writer.buffer[:]
+        self.atype.encode_into(writer, obj)
+        self.data.write(writer.buffer)
+        end = self.data.tell()
+        self.data.flush()
+        self.index.write(end.to_bytes(8, 'little'))
+        position = self.count
+        self.count += 1
+        if key is not None:
+            if self.keys is None:
+                self.keys = open(self.path + '.keys', 'ab')
+            del writer.buffer[:]
+            self.key_type.encode_into(writer, key)
+            Uint64.encode_into(writer, position)
+            self.index.flush()
+            self.keys.write(writer.buffer)
+        return position
+
+    def flush(self):
+        self.data.flush()
+        self.index.flush()
+        if self.keys is not None:
+            self.keys.flush()
+
+    def close(self):
+        for fp in (self.data, self.index, self.keys):
+            if fp is not None:
+                fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class RecordReader:
+    """
+    Decode the records of a store by position, reader[i], or by key, reader.get(key),
+    straight from the mapped file. The records appended after the reader was opened
+    are not seen.
+    """
+
+    def __init__(self, path, atype, key_type=bytes, validate=False):
+        self.atype = type_mapping(atype)
+        with open(path + '.idx', 'rb') as fp:
+            self.ends = array('Q', fp.read(os.path.getsize(path + '.idx') // 8 * 8))
+        if sys.byteorder == 'big':
+            self.ends.byteswap()
+        self.map = None
+        buffer = b''
+        if self.ends and self.ends[-1]:
+            with open(path, 'rb') as fp:
+                self.map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = self.map
+        self.cursor = Cursor(buffer, zero_copy=True, validate=validate)
+        if self.ends and self.ends[-1] > self.cursor.buffer_len:
+            raise IOError("index exceed data size: {}".format(self.cursor.buffer_len))
+        self.keys = {}
+        if os.path.exists(path + '.keys'):
+            self.load_keys(path + '.keys', type_mapping(key_type))
+
+    def load_keys(self, path, key_type):
+        with open(path, 'rb') as fp:
+            cursor = Cursor(fp.read())
+        while not cursor.is_finished():
+            try:
+                key = key_type.decode(cursor)
+                position = cursor.read_u64()
+            except BufferUnderflowError:
+                # the last key was only partly appended
+                break
+            if position < len(self.ends):
+                self.keys[MapT.hashable_key(key)] = position
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self.ends)
+        if not 0 <= position < len(self.ends):
+            raise IndexError("record {} out of range: {}".format(position, len(self.ends)))
+        start = self.ends[position - 1] if position else 0
+        cursor = self.cursor
+        cursor.offset = start
+        ret = self.atype.decode(cursor)
+        if cursor.offset != self.ends[position]:
+            raise IOError("record {} ends at {}, not {}".format(position, cursor.offset, self.ends[position]))
+        return ret
+
+    def __iter__(self):
+        for position in range(len(self.ends)):
+            yield self[position]
+
+    def __contains__(self, key):
+        return MapT.hashable_key(key) in self.keys
+
+    def get(self, key, default=None):
+        position = self.keys.get(MapT.hashable_key(key))
+        if position is None:
+            return default
+        return self[position]
+
+    def close(self):
+        # the map can't be closed while the cursor exports its buffer
+        self.cursor.buffer.release()
+        if self.map is not None:
+            self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
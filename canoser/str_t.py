@@ -1,21 +1,29 @@
-from canoser.int_type import Uint32
 from canoser.base import Base
+from canoser.writer import Writer
 
 
 class StrT(Base):
     @classmethod
     def encode(self, value):
-        output = b''
+        writer = Writer()
+        self.encode_into(writer, value)
+        return writer.getvalue()
+
+    @classmethod
+    def encode_into(self, writer, value):
         utf8 = value.encode('utf-8')
-        output += Uint32.serialize_uint32_as_uleb128(len(utf8))
-        output += utf8
-        return output
+        writer.write_uleb128(len(utf8))
+        writer.write(utf8)
 
     @classmethod
     def decode(self, cursor):
-        strlen = Uint32.parse_uint32_from_uleb128(cursor)
+        strlen = cursor.read_uleb128()
         return str(cursor.read_bytes(strlen), encoding='utf-8')
 
+    @classmethod
+    def skip(cls, cursor):
+        cursor.skip(cursor.read_uleb128())
+
     @classmethod
     def check_value(cls, value):
         if not isinstance(value, str):
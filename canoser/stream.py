@@ -0,0 +1,92 @@
+"""
+Decoding of records read from a binary file-like object, with a bounded read-ahead.
+"""
+from canoser.cursor import Cursor
+from canoser.errors import BufferUnderflowError
+from canoser.uleb128 import decode_uleb128
+
+FRAMINGS = ('concat', 'uleb128')
+
+
+class ReadAhead:
+    """
+    The unconsumed bytes read from `fp`, buffer[start:]. The buffer only grows past
+    `chunk_size` when a single record is larger than that.
+    """
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = b''
+        self.start = 0
+
+    def available(self):
+        return len(self.buffer) - self.start
+
+    def fill(self, size):
+        """
+        Read until at least `size` bytes are available, return False at the end of the stream.
+        """
+        while self.available() < size:
+            more = self.fp.read(max(self.chunk_size, size - self.available()))
+            if not more:
+                return False
+            self.buffer = self.buffer[self.start:] + more
+            self.start = 0
+        return True
+
+
+def iter_deserialize(atype, fp, framing='concat', chunk_size=65536, validate=False):
+    """
+    Return an iterator over the records decoded from the binary file-like object `fp`.
+    With the 'concat' framing records are back to back, with 'uleb128' each one is
+    prefixed by its length.
+    """
+    if framing not in FRAMINGS:
+        raise TypeError("framing should be one of {}, got {}".format(FRAMINGS, framing))
+    decode_next = _decode_framed if framing == 'uleb128' else _decode_next
+    return _iter_records(atype, ReadAhead(fp, chunk_size), decode_next, validate)
+
+
+def _iter_records(atype, reader, decode_next, validate):
+    cursor = Cursor(b'', validate=validate)
+    while reader.fill(1):
+        yield decode_next(atype, reader, cursor)
+
+
+def _decode_next(atype, reader, cursor):
+    while True:
+        cursor.reset(reader.buffer, reader.start)
+        try:
+            ret = atype.decode(cursor)
+        except BufferUnderflowError as err:
+            # Retry the record once the missing bytes, and at least as many again, are read.
+            available = reader.available()
+            reader.fill(available + max(err.needed, available))
+            if reader.available() == available:
+                raise
+            continue
+        if cursor.offset == reader.start:
+            raise IOError(f"{atype} decodes from 0 bytes, use the 'uleb128' framing for its records")
+        reader.start = cursor.offset
+        return ret
+
+
+def _decode_framed(atype, reader, cursor):
+    while True:
+        try:
+            size, start = decode_uleb128(reader.buffer, reader.start, len(reader.buffer))
+            break
+        except BufferUnderflowError:
+            if not reader.fill(reader.available() + 1):
+                raise
+    prefix = start - reader.start
+    if not reader.fill(prefix + size):
+        raise IOError("record of {} bytes truncated at the end of the stream".format(size))
+    start = reader.start + prefix
+    cursor.reset(reader.buffer, start)
+    ret = atype.decode(cursor)
+    if cursor.offset != start + size:
+        raise IOError("record of {} bytes, {} consumed".format(size, cursor.offset - start))
+    reader.start = cursor.offset
+    return ret
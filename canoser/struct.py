@@ -1,16 +1,24 @@
 from canoser.base import Base
 from canoser.types import type_mapping
+from canoser.writer import Writer
+from types import MemberDescriptorType
+import copyreg
 import json
 
 
 class TypedProperty:
-    def __init__(self, name, expected_type):
+    """
+    A field of a Struct, its value is kept in the slot `slot` of the instances.
+    """
+
+    def __init__(self, name, expected_type, slot=None):
         self.name = name
         self.expected_type = expected_type
+        self.slot = slot
 
     def __set__(self, instance, value):
         TypedProperty.check_type(self.expected_type, value)
-        instance.__dict__[self.name] = value
+        self.slot.__set__(instance, value)
 
     @staticmethod
     def check_type(datatype, value):
@@ -26,16 +34,253 @@ class TypedProperty:
             raise TypeError('{} has no check_value method'.format(datatype))
 
 
-class Struct(Base):
+# the value of the fields that are not set yet
+MISSING = object()
+
+
+def _from_values(cls, values):
+    ret = cls.__new__(cls)
+    for setter, value in zip(cls.setters(), values):
+        setter(ret, value)
+    return ret
+
+
+class FieldAccess:
+    """
+    `MyStruct.name` is the TypedProperty of the field, while the instances read its slot.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, cls, meta):
+        if cls is None:
+            return self
+        cls.initailize_fields_type()
+        return cls._properties[self.name]
+
+    def __set__(self, cls, value):
+        raise AttributeError(f"field {self.name} of {cls} can't be replaced")
+
+
+class StructMeta(type):
+    """
+    Give each subclass a __slots__ layout made of its `_fields`, if any, added to the
+    __slots__ it declares itself, so that its instances have no __dict__, but can be
+    weakly referenced. A field can't also be a class attribute. A class with
+    fields gets a metaclass of its own, for the class level access to the fields.
+
+    The fields of a class come from one line of inheritance, the slots of two structs
+    with fields of their own can't be combined. Python rejects such a class with a
+    metaclass conflict, StructMeta with a TypeError naming the structs otherwise.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        fields = [fname for fname, _ in namespace.get('_fields', ())]
+        for fname in fields:
+            if fname.startswith('__'):
+                # the slot of such a name would be mangled into _{name}{fname}
+                raise TypeError(f"field {fname} of {name} should not start with __")
+            if fname in namespace:
+                # the slot of the field would replace the class attribute
+                raise TypeError(f"field {fname} of {name} clashes with a class attribute of the same name")
+        owners = set()
+        for base in bases:
+            owner = next((klass for klass in base.__mro__ if klass.__dict__.get('_fields')), None)
+            if owner is not None:
+                owners.add(owner)
+        owners = [x for x in owners if not any(y is not x and issubclass(y, x) for y in owners)]
+        if len(owners) > 1:
+            raise TypeError("{} can't inherit the fields of more than one struct: {}".format(
+                name, ', '.join(sorted(x.__name__ for x in owners))))
+        slots = namespace.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        inherited = set(slots)
+        for base in bases:
+            for klass in base.__mro__:
+                inherited.update(klass.__dict__.get('__slots__', ()))
+        if not any(base.__weakrefoffset__ for base in bases):
+            # instances of the root class can be weakly referenced, and so all structs
+            slots = tuple(slots) + ('__weakref__',)
+        namespace['__slots__'] = tuple(slots) + tuple(x for x in fields if x not in inherited)
+        if fields:
+            mcs = type(mcs.__name__, (mcs,), {fname: FieldAccess(fname) for fname in fields})
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+from canoser.compiler import compile_encoder, compile_decoder  # noqa: E402
+
+
+class Struct(Base, metaclass=StructMeta):
     _fields = []
+    _properties = {}
     _initialized = False
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # compiled codecs are generated for one exact field list, never inherit them,
+        # even the ones a base class only gets compiled later.
+        for name in ('encode_into', 'decode'):
+            if not cls.overrides(name):
+                setattr(cls, name, Struct.__dict__[name])
+
+    @classmethod
+    def overrides(cls, name):
+        """
+        Whether the codec method `name` of this class is its own, rather than the generic
+        one of Struct or one generated by compile.
+        """
+        method = getattr(cls, name)
+        func = getattr(method, '__func__', method)
+        return func is not Struct.__dict__[name].__func__ and not getattr(func, '_canoser_compiled', False)
+
+    @classmethod
+    def compile(cls):
+        """
+        Generate the encode_into/decode of this class and return them. They replace the
+        generic methods of the class, but not the ones it defines itself.
+        """
+        try:
+            return cls.__dict__['_compiled']
+        except KeyError:
+            pass
+        if cls is Struct:
+            raise TypeError("Struct has no fields to serialize, use a subclass of it.")
+        cls.initailize_fields_type()
+        # a struct nested in itself finds its compilation in progress and keeps the generic methods
+        cls._compiled = None
+        try:
+            compiled = {'encode_into': compile_encoder(cls), 'decode': compile_decoder(cls)}
+        except BaseException:
+            del cls._compiled
+            raise
+        cls._compiled = compiled
+        for name, func in compiled.items():
+            if not cls.overrides(name):
+                setattr(cls, name, staticmethod(func))
+        return compiled
+
     @classmethod
     def initailize_fields_type(cls):
-        if not cls._initialized:
+        if not cls.__dict__.get('_initialized'):
             cls._initialized = True
-            for name, atype in cls._fields:
-                setattr(cls, name, TypedProperty(name, type_mapping(atype)))
+            cls._field_types = [(name, type_mapping(atype)) for name, atype in cls._fields]
+            slots = {}
+            for klass in reversed(cls.__mro__):
+                slots.update((k, v) for k, v in klass.__dict__.items() if isinstance(v, MemberDescriptorType))
+            cls._properties = {name: TypedProperty(name, mtype, slots.get(name)) for name, mtype in cls._field_types}
+
+    @classmethod
+    def setters(cls):
+        """
+        The functions storing the value of each field in its slot without checking it.
+        """
+        try:
+            return cls.__dict__['_setters']
+        except KeyError:
+            cls.initailize_fields_type()
+            cls._setters = [cls._properties[name].slot.__set__ for name, _ in cls._fields]
+            return cls._setters
+
+    @classmethod
+    def fixed_size(cls):
+        """
+        The encoded size of this struct if all of its fields have a fixed size, else None.
+        """
+        try:
+            return cls.__dict__['_fixed_size']
+        except KeyError:
+            cls.initailize_fields_type()
+            sizes = [mtype.fixed_size() for _, mtype in cls._field_types]
+            cls._fixed_size = None if None in sizes else sum(sizes)
+            return cls._fixed_size
+
+    @classmethod
+    def plan(cls, fields=()):
+        """
+        The steps to decode `fields` and skip the others: (name, type) for the fields to
+        decode, (None, type) for the fields to skip, and (None, size) for runs of fixed
+        size fields that are skipped together.
+        """
+        key = tuple(fields)
+        plans = cls.__dict__.get('_plans')
+        if plans is None:
+            plans = cls._plans = {}
+        try:
+            return plans[key]
+        except KeyError:
+            pass
+        cls.initailize_fields_type()
+        unknown = set(key) - {name for name, _ in cls._field_types}
+        if unknown:
+            raise TypeError('Invalid field(s): {}'.format(','.join(sorted(unknown))))
+        steps = []
+        for name, mtype in cls._field_types:
+            if name in key:
+                steps.append((name, mtype))
+                continue
+            size = mtype.fixed_size()
+            if size is None:
+                steps.append((None, mtype))
+            elif steps and steps[-1][0] is None and isinstance(steps[-1][1], int):
+                steps[-1] = (None, steps[-1][1] + size)
+            else:
+                steps.append((None, size))
+        plans[key] = steps
+        return steps
+
+    @classmethod
+    def skip(cls, cursor):
+        size = cls.fixed_size()
+        if size is not None:
+            cursor.skip(size)
+            return
+        for _, step in cls.plan():
+            if isinstance(step, int):
+                cursor.skip(step)
+            else:
+                step.skip(cursor)
+
+    @classmethod
+    def decode_fields(cls, cursor, fields, to_end=True):
+        """
+        Decode only `fields`, the other fields of the returned struct are left unset.
+        Unless `to_end`, the cursor stops after the last of them. A struct with a decode
+        of its own is decoded whole by it instead.
+        """
+        if cls.overrides('decode'):
+            return cls.decode(cursor)
+        ret = cls.__new__(cls)
+        validate = cursor.validate
+        remaining = len(set(fields))
+        for name, step in cls.plan(fields):
+            if name is not None:
+                value = step.decode(cursor)
+                if validate:
+                    step.check_value(value)
+                object.__setattr__(ret, name, value)
+                remaining -= 1
+            elif not remaining and not to_end:
+                break
+            elif isinstance(step, int):
+                cursor.skip(step)
+            else:
+                step.skip(cursor)
+        return ret
+
+    @classmethod
+    def view(cls, buffer, check=True):
+        """
+        Return a lazy instance over `buffer` that decodes each field on first access.
+        Only the offsets of the fields are computed upfront, by skipping over them. The
+        buffer must not be modified while the view is in use. A struct with a decode of
+        its own is decoded eagerly by it instead.
+        """
+        if cls.overrides('decode'):
+            return cls.deserialize(buffer, check)
+        from canoser.view import view_class
+        return view_class(cls).from_buffer(buffer, check)
 
     def __init__(self, *args, **kwargs):
         self.__class__.initailize_fields_type()
@@ -45,14 +290,12 @@ class Struct(Base):
 
         # Set all of the positional arguments
         for (name, _type), value in zip(self._fields, args):
-            typed = getattr(self, name)
-            typed.__set__(self, value)
+            setattr(self, name, value)
 
         # Set the remaining keyword arguments
         for name, _type in self._fields[len(args):]:
             if name in kwargs:
-                typed = getattr(self, name)
-                typed.__set__(self, kwargs.pop(name))
+                setattr(self, name, kwargs.pop(name))
 
         # Check for any remaining unknown arguments
         if kwargs:
@@ -60,47 +303,63 @@ class Struct(Base):
 
     @classmethod
     def encode(cls, obj):
-        output = b''
-        for name, atype in obj._fields:
-            value = getattr(obj, name)
-            output += type_mapping(atype).encode(value)
-        return output
+        writer = Writer()
+        encode_into = cls.encode_into
+        if getattr(encode_into, '__func__', None) is Base.encode_into.__func__:
+            # called from an overridden encode, whose encode_into calls it back
+            encode_into = cls.compile()['encode_into']
+        encode_into(writer, obj)
+        return writer.getvalue()
+
+    @classmethod
+    def encode_into(cls, writer, obj):
+        cls.compile()['encode_into'](writer, obj)
 
     @classmethod
     def decode(cls, cursor):
-        ret = cls.__new__(cls)
-        ret.__init__()
-        for name, atype in ret._fields:
-            prop = getattr(ret, name)
-            mtype = type_mapping(atype)
-            assert mtype == prop.expected_type
-            value = mtype.decode(cursor)
-            prop.__set__(ret, value)
-        return ret
+        return cls.compile()['decode'](cursor)
 
     @classmethod
     def check_value(cls, value):
         if not isinstance(value, cls):
             raise TypeError('value {} is not {} type'.format(value, cls))
 
+    def __setattr__(self, name, value):
+        cls = self.__class__
+        cls.initailize_fields_type()
+        prop = cls._properties.get(name)
+        if prop is not None:
+            TypedProperty.check_type(prop.expected_type, value)
+        object.__setattr__(self, name, value)
+
     def __eq__(self, other):
-        if type(self) != type(other):
+        # a lazy view compares equal to the decoded struct
+        if getattr(type(self), '_view_of', type(self)) != getattr(type(other), '_view_of', type(other)):
             return False
         for name, atype in self._fields:
-            v1 = getattr(self, name)
-            v2 = getattr(other, name)
+            v1 = getattr(self, name, MISSING)
+            v2 = getattr(other, name, MISSING)
             if v1 != v2:
                 return False
         return True
 
+    def __reduce__(self):
+        """
+        Pickle a struct as the tuple of its field values.
+        """
+        values = tuple(getattr(self, name, MISSING) for name, _ in self._fields)
+        if any(value is MISSING for value in values):
+            state = {name: value for (name, _), value in zip(self._fields, values) if value is not MISSING}
+            return copyreg.__newobj__, (self.__class__,), (None, state)
+        return _from_values, (self.__class__, values)
+
     def to_json_serializable(self):
         amap = {}
-        for name, atype in self._fields:
-            value = getattr(self, name)
-            if isinstance(value, TypedProperty):
+        for name, atype in self._field_types:
+            value = getattr(self, name, MISSING)
+            if value is MISSING:
                 amap[name] = None
             else:
-                atype = type_mapping(atype)
                 amap[name] = atype.to_json_serializable(value)
         return amap
 
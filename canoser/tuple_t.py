@@ -1,4 +1,5 @@
 from canoser.base import Base
+from canoser.writer import Writer
 
 
 class TupleT(Base):
@@ -7,11 +8,14 @@ class TupleT(Base):
         self.ttypes = ttypes
 
     def encode(self, value):
-        output = b""
+        writer = Writer()
+        self.encode_into(writer, value)
+        return writer.getvalue()
+
+    def encode_into(self, writer, value):
         zipped = zip(self.ttypes, value)
         for k, v in zipped:
-            output += k.encode(v)
-        return output
+            k.encode_into(writer, v)
 
     def decode(self, cursor):
         arr = []
@@ -19,6 +23,16 @@ class TupleT(Base):
             arr.append(k.decode(cursor))
         return tuple(arr)
 
+    def skip(self, cursor):
+        for k in self.ttypes:
+            k.skip(cursor)
+
+    def fixed_size(self):
+        sizes = [x.fixed_size() for x in self.ttypes]
+        if None in sizes:
+            return None
+        return sum(sizes)
+
     def check_value(self, value):
         if len(value) != len(self.ttypes):
             raise TypeError(f"{len(value)} is not equal to {len(self.ttypes)}")
@@ -29,14 +43,21 @@ class TupleT(Base):
             k.check_value(v)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, TupleT):
             return False
+        if len(self.ttypes) != len(other.ttypes):
+            return False
         zipped = zip(self.ttypes, other.ttypes)
         for t1, t2 in zipped:
             if t1 != t2:
                 return False
         return True
 
+    def __hash__(self):
+        return hash((TupleT, self.ttypes))
+
     def to_json_serializable(cls, obj):
         ret = []
         # https://stackoverflow.com/questions/15721363/preserve-python-tuples-with-json
@@ -7,6 +7,10 @@ from canoser.bool_t import BoolT
 from canoser.array_t import ArrayT
 
 
+_interned = {}
+_resolved = {}
+
+
 def my_import(name):
     components = name.split('.')
     mod = __import__(components[0])
@@ -15,33 +19,70 @@ def my_import(name):
     return mod
 
 
-def type_mapping(field_type):  # noqa: C901
+def intern_type(atype):
+    """
+    Return the canonical instance of a hashable canoser type object,
+    so that equal types are also identical.
+    """
+    return _interned.setdefault(atype, atype)
+
+
+def schema_key(field_type):
     """
-    Mapping python types to canoser types
+    Hashable key of a field type declaration such as `[Uint8, 32]` or `{str: Uint64}`.
     """
+    if type(field_type) == list:
+        return (list, tuple(schema_key(x) for x in field_type))
+    elif type(field_type) == dict:
+        return (dict, tuple((schema_key(k), schema_key(v)) for k, v in field_type.items()))
+    elif type(field_type) == tuple:
+        return (tuple, tuple(schema_key(x) for x in field_type))
+    elif type(field_type) == str:
+        return (str, field_type)
+    return field_type
+
+
+def type_mapping(field_type):
+    """
+    Mapping python types to canoser types. Each distinct declaration is resolved only once,
+    later calls return the same interned type object.
+    """
+    try:
+        key = schema_key(field_type)
+        return _resolved[key]
+    except TypeError:
+        # unhashable user defined type, nothing to cache
+        return _type_mapping(field_type)
+    except KeyError:
+        ret = _type_mapping(field_type)
+        _resolved[key] = ret
+        return ret
+
+
+def _type_mapping(field_type):  # noqa: C901
     if field_type == str:
         return StrT
     elif field_type == bytes:
-        return BytesT()
+        return intern_type(BytesT())
     elif field_type == bytearray:
-        return ByteArrayT()
+        return intern_type(ByteArrayT())
     elif field_type == bool:
         return BoolT
     elif type(field_type) == list:
         if len(field_type) == 0:
-            return ArrayT(Uint8)
+            return intern_type(ArrayT(Uint8))
         elif len(field_type) == 1:
             item = field_type[0]
-            return ArrayT(type_mapping(item))
+            return intern_type(ArrayT(type_mapping(item)))
         elif len(field_type) == 2:
             item = field_type[0]
             size = field_type[1]
-            return ArrayT(type_mapping(item), size)
+            return intern_type(ArrayT(type_mapping(item), size))
         elif len(field_type) == 3:
             item = field_type[0]
             size = field_type[1]
             encode_len = field_type[2]
-            return ArrayT(type_mapping(item), size, encode_len)
+            return intern_type(ArrayT(type_mapping(item), size, encode_len))
         else:
             raise TypeError("Array has one item type, no more.")
         raise AssertionError("unreacheable")
@@ -54,12 +95,12 @@ def type_mapping(field_type):  # noqa: C901
             vtype = next(iter(field_type.values()))
         else:
             raise TypeError("Map type has one item mapping key type to value type.")
-        return MapT(type_mapping(ktype), type_mapping(vtype))
+        return intern_type(MapT(type_mapping(ktype), type_mapping(vtype)))
     elif type(field_type) == tuple:
         arr = []
         for item in field_type:
             arr.append(type_mapping(item))
-        return TupleT(*arr)
+        return intern_type(TupleT(*arr))
     elif type(field_type) == str:
         return my_import(field_type)
     else:
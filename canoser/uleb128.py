@@ -0,0 +1,46 @@
+"""
+ULEB128 varints, used by LCS for the length of sequences, maps and strings and for enum tags.
+"""
+from canoser.errors import BufferUnderflowError
+
+MAX_SHIFT = 28
+TABLE_SIZE = 4096
+
+
+def _encode(value):
+    ret = bytearray()
+    while value >= 0x80:
+        # Write 7 (lowest) bits of data and set the 8th bit to 1.
+        ret.append((value & 0x7f) | 0x80)
+        value >>= 7
+    # Write the remaining bits of data and set the highest bit to 0.
+    ret.append(value)
+    return bytes(ret)
+
+
+# encoded prefixes of the common lengths
+ENCODED = [_encode(x) for x in range(TABLE_SIZE)]
+
+
+def encode_uleb128(value):
+    if 0 <= value < TABLE_SIZE:
+        return ENCODED[value]
+    return _encode(value)
+
+
+def decode_uleb128(buffer, offset, end):
+    """
+    Decode a Uint32 ULEB128 from buffer[offset:end], return the value and the new offset.
+    """
+    value = 0
+    shift = 0
+    while offset < end:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+        if shift > MAX_SHIFT:
+            raise ValueError("invalid ULEB128 representation for Uint32")
+    raise BufferUnderflowError("invalid ULEB128 representation for Uint32")
@@ -0,0 +1,208 @@
+"""
+Lazy views over serialized structs, see Struct.view.
+"""
+from canoser.cursor import Cursor
+from canoser.struct import _from_values
+from canoser.compiler import unwrap, _is_struct
+from array import array
+
+# values that can't be changed in place, a view holding only these still matches its bytes
+IMMUTABLE = (int, bool, str, bytes, type(None))
+
+
+class LazyField:
+    """
+    A field of a view, decoded into the slot of the field on first access.
+    """
+
+    def __init__(self, name, expected_type, index, slot):
+        self.name = name
+        self.expected_type = expected_type
+        self.index = index
+        self.slot = slot
+        self.struct_type = unwrap(expected_type) if _is_struct(unwrap(expected_type)) else None
+
+    def is_loaded(self, instance):
+        try:
+            self.slot.__get__(instance, None)
+        except AttributeError:
+            return False
+        return True
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            pass
+        cursor = instance._view_cursor
+        start = instance._view_offsets[self.index]
+        if self.struct_type is not None:
+            end = instance._view_offsets[self.index + 1]
+            value = self.struct_type.view(cursor.buffer[start:end])
+        else:
+            cursor.offset = start
+            value = self.expected_type.decode(cursor)
+            if not isinstance(value, IMMUTABLE):
+                instance._view_clean = False
+        self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance, value):
+        # the value is checked by Struct.__setattr__
+        self.slot.__set__(instance, value)
+        instance._view_clean = False
+
+
+def view_class(cls):
+    """
+    The subclass of a Struct whose instances are lazy views.
+    """
+    try:
+        return cls.__dict__['_view_class']
+    except KeyError:
+        pass
+    cls.initailize_fields_type()
+
+    def decode(cursor):
+        return cls.decode(cursor)
+
+    fields = [LazyField(name, mtype, index, cls._properties[name].slot) for index, (name, mtype) in enumerate(cls._field_types)]
+    namespace = {
+        '__slots__': ('_view_cursor', '_view_offsets', '_view_clean'),
+        '__qualname__': cls.__qualname__,
+        '__module__': cls.__module__,
+        '_view_of': cls,
+        '_view_fields': fields,
+        '_initialized': True,
+        'from_buffer': classmethod(_from_buffer),
+        'encode_into': classmethod(_encode_into),
+        'decode': staticmethod(decode),
+        'loaded_fields': _loaded_fields,
+        '__reduce__': _reduce,
+    }
+    namespace.update((field.name, field) for field in fields)
+    cls._view_class = type(cls)(cls.__name__, (cls,), namespace)
+    return cls._view_class
+
+
+def _from_buffer(cls, buffer, check=True):
+    cursor = Cursor(buffer, zero_copy=True)
+    offsets = []
+    for _, mtype in cls._field_types:
+        offsets.append(cursor.offset)
+        mtype.skip(cursor)
+    offsets.append(cursor.offset)
+    if check and not cursor.is_finished():
+        raise IOError("bytes not all consumed:{}, {}".format(len(buffer), cursor.offset))
+    ret = cls.__new__(cls)
+    ret._view_cursor = cursor
+    ret._view_offsets = offsets
+    ret._view_clean = True
+    return ret
+
+
+def _loaded_fields(self):
+    """
+    The names of the fields decoded or assigned so far.
+    """
+    return [field.name for field in self._view_fields if field.is_loaded(self)]
+
+
+def _is_clean(view):
+    if not view._view_clean:
+        return False
+    for field in view._view_fields:
+        if field.struct_type is not None and field.is_loaded(view):
+            value = field.slot.__get__(view, None)
+            if '_view_of' in type(value).__dict__ and not _is_clean(value):
+                return False
+    return True
+
+
+def _encode_into(cls, writer, obj):
+    if _is_clean(obj):
+        # nothing could have changed since the view was made, copy its bytes
+        offsets = obj._view_offsets
+        writer.write(obj._view_cursor.buffer[offsets[0]:offsets[-1]])
+        return
+    cls._view_of.encode_into(writer, obj)
+
+
+def _reduce(self):
+    cls = self._view_of
+    return _from_values, (cls, tuple(getattr(self, name) for name, _ in cls._fields))
+
+
+class VecView:
+    """
+    Random access to the elements of a serialized ArrayT, vec_view[i] decodes element i
+    only. Elements of a fixed size are located by arithmetic. Otherwise the offsets of
+    the elements are indexed once, by skipping over them, and the index can be saved
+    with index.tobytes() and passed back to ArrayT.view later.
+    """
+
+    def __init__(self, atype, buffer, index=None):
+        self.atype = atype
+        self.cursor = Cursor(buffer, zero_copy=True)
+        self.count = atype.read_size(self.cursor)
+        self.start = self.cursor.offset
+        self.item_size = atype.atype.fixed_size()
+        if self.item_size is not None:
+            end = self.start + self.count * self.item_size
+            if end > self.cursor.buffer_len:
+                raise IOError("{} exceed buffer size: {}".format(end, self.cursor.buffer_len))
+            self._index = None
+            return
+        if index is not None:
+            if not isinstance(index, array):
+                index = array('Q', index)
+            if len(index) != self.count + 1 or index[0] != self.start or index[-1] > self.cursor.buffer_len:
+                raise IOError("index doesn't match the {} elements of the buffer".format(self.count))
+        self._index = index
+
+    @property
+    def index(self):
+        """
+        The count + 1 offsets in the buffer where the elements start and the last one ends.
+        """
+        if self._index is None:
+            if self.item_size is not None:
+                return array('Q', range(self.start, self.start + (self.count + 1) * self.item_size, self.item_size))
+            self._index = self.build_index()
+        return self._index
+
+    def build_index(self):
+        cursor = self.cursor
+        cursor.offset = self.start
+        skip = self.atype.atype.skip
+        index = array('Q', [self.start])
+        for _ in range(self.count):
+            skip(cursor)
+            index.append(cursor.offset)
+        return index
+
+    def offset(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("element {} out of range: {}".format(i, self.count))
+        if self.item_size is not None:
+            return self.start + i * self.item_size
+        return self.index[i]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self.count))]
+        self.cursor.offset = self.offset(i)
+        return self.atype.atype.decode(self.cursor)
+
+    def __iter__(self):
+        cursor = Cursor(self.cursor.buffer, self.start, zero_copy=True)
+        decode = self.atype.atype.decode
+        for _ in range(self.count):
+            yield decode(cursor)
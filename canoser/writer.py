@@ -0,0 +1,28 @@
+from canoser.uleb128 import encode_uleb128
+
+
+class Writer:
+    """
+    A growable output buffer shared by all the codecs of one object tree.
+    """
+
+    def __init__(self, buffer=None):
+        if buffer is None:
+            buffer = bytearray()
+        self.buffer = buffer
+        self.write = buffer.extend
+
+    def write_u8(self, value):
+        self.buffer.append(value)
+
+    def write_uleb128(self, value):
+        if value < 0x80:
+            self.buffer.append(value)
+        else:
+            self.buffer += encode_uleb128(value)
+
+    def getvalue(self):
+        return bytes(self.buffer)
+
+    def __len__(self):
+        return len(self.buffer)
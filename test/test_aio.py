@@ -0,0 +1,84 @@
+from canoser import *
+from canoser.uleb128 import encode_uleb128
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import pytest
+
+
+class Account(Struct):
+    _fields = [('address', [Uint8, 32, False]), ('balance', Uint64), ('name', str), ('code', [Uint8])]
+
+
+accounts = [Account([i] * 32, i * 1000, 'n' * i, [i] * (i * 50)) for i in range(20)]
+
+
+def make_reader(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def run_until_complete(coro):
+    # asyncio.run needs python 3.7
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def collect(records):
+    return [x async for x in records]
+
+
+def test_read_from():
+    async def run():
+        reader = make_reader(b''.join(x.serialize() for x in accounts[:2]))
+        assert await Account.read_from(reader) == accounts[0]
+        assert await Account.read_from(reader) == accounts[1]
+        with pytest.raises(asyncio.IncompleteReadError):
+            await Account.read_from(reader)
+        data = accounts[3].serialize()
+        reader = make_reader(encode_uleb128(len(data)) + data)
+        assert await Account.read_from(reader, 'uleb128') == accounts[3]
+        with pytest.raises(TypeError):
+            await Account.read_from(reader, 'uleb')
+    run_until_complete(run())
+
+
+def test_iter_from():
+    async def run():
+        buffer, _ = Account.serialize_many(accounts)
+        assert await collect(Account.iter_from(make_reader(buffer))) == accounts
+        with pytest.raises(asyncio.IncompleteReadError):
+            await collect(Account.iter_from(make_reader(buffer[:-1])))
+    run_until_complete(run())
+
+
+def test_iter_from_offload():
+    data = b''.join(encode_uleb128(len(x)) + x for x in (y.serialize() for y in accounts))
+
+    async def run():
+        assert await collect(Account.iter_from(make_reader(data), 'uleb128')) == accounts
+        with ThreadPoolExecutor(2) as executor:
+            records = Account.iter_from(make_reader(data), 'uleb128', executor=executor,
+                                        offload_size=300, max_pending=2)
+            assert await collect(records) == accounts
+    run_until_complete(run())
+
+
+def test_read_frame():
+    from canoser.aio import read_frame
+
+    async def run():
+        assert await read_frame(make_reader(encode_uleb128(300) + b'x' * 300)) == b'x' * 300
+        assert await read_frame(make_reader(b'\x03abc'), b'\x02') == b'\x03a'
+        with pytest.raises(ValueError):
+            await read_frame(make_reader(b'\xff' * 6))
+
+        class Nothing(Struct):
+            _fields = []
+        with pytest.raises(IOError):
+            await collect(Nothing.iter_from(make_reader(b'\x00')))
+    run_until_complete(run())
@@ -0,0 +1,51 @@
+import json
+import pickle
+import pytest
+from canoser import *
+
+
+class Balances(Struct):
+    _fields = [('balances', {str: Uint64}), ('keys', {bytes: Uint8})]
+
+
+def test_order():
+    amap = CanonicalMap(Uint16, {256: 'a', 1: 'b'})
+    amap[2] = 'c'
+    amap[1] = 'd'
+    assert list(amap) == [256, 1, 2]
+    assert list(amap.encoded_items()) == [(b'\x00\x01', 'a'), (b'\x01\x00', 'd'), (b'\x02\x00', 'c')]
+    del amap[256]
+    assert list(amap) == [1, 2]
+    assert amap == {1: 'd', 2: 'c'}
+    with pytest.raises(KeyError):
+        del amap[3]
+    assert len(amap) == 2
+
+
+def test_serialize():
+    names = [f"name{i}" for i in range(100, 0, -3)]
+    plain = Balances({x: len(x) for x in names}, {b'\x02': 1})
+    x = Balances(CanonicalMap(str), CanonicalMap(bytes, {b'\x02': 1}))
+    for name in names:
+        x.balances[name] = len(name)
+    assert x.serialize() == plain.serialize()
+    del x.balances['name4']
+    del plain.balances['name4']
+    assert x.serialize() == plain.serialize()
+    assert Balances.deserialize(x.serialize()) == plain
+    assert json.loads(x.to_json()) == json.loads(plain.to_json())
+
+
+def test_bytes_key():
+    amap = CanonicalMap([Uint8], {b'ab': 1})
+    amap[[97]] = 2
+    assert list(amap) == [b'a', b'ab']
+    assert MapT(ArrayT(Uint8), Uint8).encode(amap) == b'\x02\x01a\x02\x02ab\x01'
+
+
+def test_pickle():
+    amap = CanonicalMap(str, {'b': 1, 'a': 2})
+    amap2 = pickle.loads(pickle.dumps(amap))
+    assert list(amap2.encoded_items()) == list(amap.encoded_items())
+    amap2['c'] = 3
+    assert 'c' not in amap
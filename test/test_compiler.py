@@ -0,0 +1,163 @@
+from canoser import *
+from canoser.compiler import has_fixed_layout
+import pytest
+
+
+class Address(DelegateT):
+    delegate_type = [Uint8, 32]
+
+
+class EventHandle(Struct):
+    _fields = [('count', Uint64), ('key', [Uint8, 32, False])]
+
+
+class Header(Struct):
+    _fields = [
+        ('sender', Address),
+        ('sequence_number', Uint64),
+        ('flag', bool),
+        ('amount', Uint128),
+        ('delta', Int128),
+        ('tag', BytesT(4)),
+        ('counters', [Int16, 3]),
+        ('pair', (Uint8, Int32)),
+        ('events', EventHandle),
+    ]
+
+
+class Mixed(Struct):
+    _fields = [
+        ('a', Uint32),
+        ('b', bool),
+        ('name', str),
+        ('header', Header),
+        ('c', Int8),
+    ]
+
+
+def make_header():
+    return Header(
+        sender=[7] * 32,
+        sequence_number=12,
+        flag=True,
+        amount=Uint128.max_value,
+        delta=Int128.min_value + 1,
+        tag=b'abcd',
+        counters=[-1, 0, 1],
+        pair=(3, -4),
+        events=EventHandle(5, [1] * 32),
+    )
+
+
+def encode_fields(obj):
+    return b''.join(mtype.encode(getattr(obj, name)) for name, mtype in obj._field_types)
+
+
+def test_fixed_layout():
+    assert has_fixed_layout(Header)
+    assert not has_fixed_layout(Mixed)
+    assert Header.fixed_size() == 33 + 8 + 1 + 16 + 16 + 5 + 7 + 5 + 40
+    assert Mixed.fixed_size() is None
+    header = make_header()
+    sx = header.serialize()
+    assert sx == encode_fields(header)
+    assert len(sx) == Header.fixed_size()
+    header2 = Header.deserialize(sx)
+    assert header2 == header
+    assert header2.pair == (3, -4)
+    assert header2.counters == [-1, 0, 1]
+    assert header2.events.key == [1] * 32
+
+
+def test_mixed_runs():
+    mixed = Mixed(1, False, 'abc', make_header(), -2)
+    sx = mixed.serialize()
+    assert sx == encode_fields(mixed)
+    assert Mixed.deserialize(sx) == mixed
+
+
+def test_fixed_layout_errors():
+    sx = bytearray(make_header().serialize())
+    with pytest.raises(IOError):
+        Header.deserialize(bytes(sx[:-1]))
+    with pytest.raises(IOError):
+        Header.deserialize(bytes(sx) + b'\x00')
+    assert Header.deserialize(bytes(sx) + b'\x00', check=False) == make_header()
+    bad_bool = bytearray(sx)
+    bad_bool[33 + 8] = 2
+    with pytest.raises(TypeError):
+        Header.deserialize(bytes(bad_bool))
+    bad_len = bytearray(sx)
+    bad_len[0] = 31
+    with pytest.raises(TypeError):
+        Header.deserialize(bytes(bad_len))
+    header = make_header()
+    header.sender = [7] * 32
+    object.__setattr__(header, 'sender', [7] * 31)
+    with pytest.raises(TypeError):
+        header.serialize()
+
+
+class Empty(Struct):
+    _fields = [('unit', ()), ('a', Uint8)]
+
+
+class Celsius(Struct):
+    _fields = [('degrees', Int16)]
+
+    @classmethod
+    def decode(cls, cursor):
+        ret = super().decode(cursor)
+        ret.degrees = max(ret.degrees, -273)
+        return ret
+
+
+class Reading(Struct):
+    _fields = [('at', Uint64), ('temperature', Celsius)]
+
+
+def test_empty_tuple():
+    assert has_fixed_layout(Empty)
+    assert Empty((), 1).serialize() == b'\x01'
+    assert Empty.deserialize(b'\x01') == Empty((), 1)
+
+
+def test_own_codec_not_inlined():
+    assert has_fixed_layout(Celsius) is False
+    sx = Reading(1, Celsius(-300)).serialize()
+    assert Reading.deserialize(sx).temperature.degrees == -273
+
+
+class Flipped(DelegateT):
+    delegate_type = Uint8
+
+    @classmethod
+    def encode(cls, value):
+        return Uint8.encode(value ^ 0xff)
+
+    @classmethod
+    def decode(cls, cursor):
+        return Uint8.decode(cursor) ^ 0xff
+
+
+class Timestamp(Uint64):
+    @classmethod
+    def encode(cls, value):
+        return Uint64.encode(value // 1000)
+
+    @classmethod
+    def decode(cls, cursor):
+        return Uint64.decode(cursor) * 1000
+
+
+class Flags(Struct):
+    _fields = [('a', Flipped), ('b', Uint16), ('at', Timestamp)]
+
+
+def test_own_codec_called():
+    assert not has_fixed_layout(Flipped)
+    assert not has_fixed_layout(Timestamp)
+    assert has_fixed_layout(Uint128) and has_fixed_layout(Address)
+    sx = Flags(1, 2, 5000).serialize()
+    assert sx == b'\xfe\x02\x00\x05' + b'\x00' * 7
+    assert Flags.deserialize(sx) == Flags(1, 2, 5000)
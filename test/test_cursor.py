@@ -31,4 +31,67 @@ def test_bytearray():
     assert cursor.offset == 3
     assert cursor.is_finished() == False
     assert cursor.read_to_end() == b'\x04'
-    assert cursor.is_finished() == True
\ No newline at end of file
+    assert cursor.is_finished() == True
+
+def test_zero_copy():
+    array = bytearray(b'\x05\x02\x03\x04')
+    cursor = Cursor(array, zero_copy=True)
+    assert isinstance(cursor.buffer, memoryview)
+    assert cursor.read_u8() == 5
+    assert cursor.peek_bytes(1) == b'\x02'
+    assert type(cursor.read_bytes(1)) == bytes
+    view = cursor.read_view(2)
+    assert view == b'\x03\x04'
+    array[3] = 9
+    assert view == b'\x03\x09'
+    assert cursor.is_finished()
+
+
+def test_zero_copy_typed_array():
+    from array import array
+    assert Uint16.deserialize(array('H', [513]), zero_copy=True) == 513
+    with pytest.raises(IOError):
+        Uint16.deserialize(array('B', [1]), zero_copy=True)
+
+
+def test_zero_copy_mmap():
+    import mmap
+    mm = mmap.mmap(-1, 4)
+    mm.write(b'\x03abc')
+    assert BytesT().decode(Cursor(mm, zero_copy=True)) == b'abc'
+    view = BytesT().decode(Cursor(mm, views=True))
+    assert isinstance(view, memoryview)
+    assert view == b'abc'
+    view.release()
+    mm.close()
+
+
+def test_views():
+    class Blob(Struct):
+        _fields = [('data', bytes), ('kvs', {bytes: bytearray})]
+    blob = Blob(b'abc', {b'k': bytearray(b'v')})
+    buffer = bytearray(blob.serialize())
+    blob2 = Blob.deserialize(buffer, views=True)
+    assert isinstance(blob2.data, memoryview)
+    assert blob2 == blob
+    assert blob2.serialize() == blob.serialize()
+    assert Blob.deserialize(buffer, zero_copy=True) == blob
+
+
+def test_read_int():
+    data = b'\x01' + Uint16.encode(65535) + Int32.encode(-5) + Uint64.encode(2**64-1) + \
+        Int128.encode(Int128.min_value) + Uint128.encode(Uint128.max_value) + b'\x00\x02'
+    for cursor in [Cursor(data), Cursor(bytearray(data), zero_copy=True)]:
+        assert cursor.read_bool() == True
+        assert cursor.read_u16() == 65535
+        assert cursor.read_i32() == -5
+        assert cursor.read_u64() == 2**64-1
+        assert cursor.read_i128() == Int128.min_value
+        assert cursor.read_u128() == Uint128.max_value
+        assert cursor.read_bool() == False
+        with pytest.raises(TypeError):
+            cursor.read_bool()
+        with pytest.raises(IOError):
+            cursor.read_u16()
+    assert Int128.decode(Cursor(Int128.encode(-2))) == -2
+    assert Int8.decode(Cursor(b'\xff')) == -1
@@ -39,3 +39,21 @@ def test_delegate():
     assert bs == b'\x03\x01\x00\x01'
     x2 = Bools.deserialize(bs)
     assert x == x2
+
+
+class Hex(Address):
+    @classmethod
+    def to_json_serializable(cls, value):
+        return 'hex'
+
+
+def test_bound_to_delegate():
+    dtype = Address.dtype()
+    assert Address.dtype() is dtype
+    assert Address.encode_into == dtype.encode_into
+    assert Address.decode == dtype.decode
+    assert Address.fixed_size() == 33
+    assert Address.view(Address.encode([7] * ADDRESS_LENGTH))[31] == 7
+    assert Hex.dtype() is dtype
+    assert Hex.to_json_serializable([1]) == 'hex'
+    assert Hex.decode == dtype.decode
@@ -142,3 +142,60 @@ def test_enum_wrap():
     ]
   ]
 }"""
+
+
+class Status(RustEnum):
+    _enums = [('Keep', Uint64, 0), ('Discard', str, 5), ('Retry', None, 9)]
+
+
+def test_discontinuous_index():
+    status = Status('Discard', 'gas')
+    assert status.index == 5
+    assert status.Discard and not status.Keep and not status.Retry
+    assert status.enum_name == 'Discard'
+    assert status.serialize() == b'\x05\x03gas'
+    assert Status.deserialize(b'\x05\x03gas') == status
+    assert Status.deserialize(b'\x09') == Status('Retry')
+    assert Status.new_with_index_value(0, 3) == Status('Keep', 3)
+    with pytest.raises(TypeError):
+        Status.deserialize(b'\x01')
+    with pytest.raises(TypeError):
+        Status.new_with_index_value(1, None)
+    assert Status('Retry').to_json_serializable() == 'Retry'
+
+
+def test_variant_predicate_property():
+    assert isinstance(TransactionArgument.__dict__['ByteArray'], property)
+    assert TransactionArgument('ByteArray', [1]).ByteArray
+    with pytest.raises(TypeError):
+        class Duplicated(RustEnum):
+            _enums = [('A', None), ('B', None, 0)]
+        Duplicated('A')
+
+
+def test_variant_predicate_subclass():
+    class A(RustEnum):
+        _enums = [('X', None), ('Y', None)]
+
+        def describe(self):
+            return 'a'
+
+    class B(A):
+        _enums = [('Y', None), ('X', None), ('describe', None)]
+
+    assert B('X').X and not B('X').Y
+    assert A('X').X and not A('X').Y
+    assert B('describe').describe() == 'a'
+
+
+def test_unit_variant_shared():
+    retry = Status.deserialize(b'\x09')
+    assert retry is Status.deserialize(b'\x09')
+    assert retry is Status.new_with_index_value(9, None)
+    assert not hasattr(retry, '__dict__')
+    assert deepcopy(retry) is retry
+    with pytest.raises(TypeError):
+        retry.value = 'x'
+    with pytest.raises(TypeError):
+        retry._index = 0
+    assert Status.deserialize(b'\x05\x01a') is not Status.deserialize(b'\x05\x01a')
@@ -0,0 +1,120 @@
+from canoser import *
+import pytest
+
+
+class Payload(RustEnum):
+    _enums = [('empty', None), ('amount', Uint64), ('script', [Uint8]), ('args', [str])]
+
+
+class OptionalAmount(RustOptional):
+    _type = Uint128
+
+
+class Inner(Struct):
+    _fields = [('id', Uint32), ('flag', bool)]
+
+
+class Message(Struct):
+    _fields = [
+        ('sender', [Uint8, 32, False]),
+        ('payloads', [Payload]),
+        ('inners', [Inner]),
+        ('names', {str: [Uint16]}),
+        ('pair', (str, Int8)),
+        ('amount', OptionalAmount),
+        ('blob', bytes),
+    ]
+
+
+message = Message(
+    sender=[7] * 32,
+    payloads=[Payload('empty'), Payload('amount', 3), Payload('script', [1] * 300), Payload('args', ['a', 'bc'])],
+    inners=[Inner(1, True), Inner(2, False)],
+    names={'x': [1, 2, 3], 'yy': []},
+    pair=('p', -3),
+    amount=OptionalAmount(2**100),
+    blob=b'\x00' * 1000,
+)
+
+
+def feed_by(decoder, data, size):
+    for i in range(0, len(data), size):
+        decoder.feed(data[i:i + size])
+
+
+def test_incremental_decode():
+    data = message.serialize()
+    for size in (1, 3, 64, len(data)):
+        decoder = IncrementalDecoder(Message)
+        feed_by(decoder, data, size)
+        assert decoder.done and decoder.needed == 0
+        assert decoder.value == message
+        assert decoder.unused_data == b''
+
+
+def test_incremental_needed():
+    data = Payload('script', [1] * 300).serialize()
+    decoder = IncrementalDecoder(Payload)
+    assert decoder.needed == 1
+    assert decoder.feed(data[:1]) == 1
+    assert decoder.feed(data[1:2]) == 1
+    assert decoder.feed(data[2:3]) == 300
+    assert decoder.feed(data[3:103]) == 200
+    assert decoder.feed(data[103:] + b'next') == 0
+    assert decoder.value == Payload('script', [1] * 300)
+    assert decoder.unused_data == b'next'
+
+
+def test_incremental_invalid():
+    decoder = IncrementalDecoder(Payload, validate=True)
+    with pytest.raises(TypeError):
+        decoder.feed(b'\x09')
+    decoder = IncrementalDecoder(OptionalAmount)
+    with pytest.raises(TypeError):
+        decoder.feed(b'\x02')
+    decoder = IncrementalDecoder([Uint8])
+    with pytest.raises(ValueError):
+        decoder.feed(b'\xff' * 5)
+
+
+def test_incremental_map_order():
+    atype = {str: Uint8}
+    data = MapT(StrT, Uint8).encode({'a': 2, 'b': 1})
+    decoder = IncrementalDecoder(atype)
+    for i in range(len(data)):
+        decoder.feed(data[i:i + 1])
+    assert decoder.value == {'a': 2, 'b': 1}
+    for bad in (b'\x02\x01b\x01\x01a\x02', b'\x02\x01a\x01\x01a\x02'):
+        with pytest.raises(TypeError):
+            IncrementalDecoder(atype).feed(bad)
+        with pytest.raises(TypeError):
+            MapT(StrT, Uint8).decode(Cursor(bad))
+
+
+class Shout(DelegateT):
+    delegate_type = str
+
+    @classmethod
+    def decode(cls, cursor):
+        return StrT.decode(cursor).upper()
+
+
+class Greeting(Struct):
+    _fields = [('name', str), ('id', Uint8)]
+
+    @classmethod
+    def decode(cls, cursor):
+        ret = super().decode(cursor)
+        ret.name = ret.name.upper()
+        return ret
+
+
+def test_incremental_own_decode():
+    for atype, data, expected in [
+        (Shout, Shout.encode('abc'), 'ABC'),
+        (Greeting, Greeting('abc', 1).serialize(), Greeting('ABC', 1)),
+        ([Greeting], ArrayT(Greeting).encode([Greeting('abc', 1)]), [Greeting('ABC', 1)]),
+    ]:
+        decoder = IncrementalDecoder(atype)
+        feed_by(decoder, data, 1)
+        assert decoder.value == expected
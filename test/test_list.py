@@ -43,4 +43,41 @@ def test_int_list_as_dict_key():
     addrs = AddrStruct(amap)
     ser = addrs.serialize()
     addr2 = AddrStruct.deserialize(ser)
-    assert addrs.map == addr2.map
\ No newline at end of file
+    assert addrs.map == addr2.map
+
+def test_uint8_bulk():
+    arrt = ArrayT(Uint8)
+    assert arrt.is_bytes
+    assert arrt.encode([1, 2, 255]) == b'\x03\x01\x02\xff'
+    assert arrt.decode(Cursor(b'\x03\x01\x02\xff')) == [1, 2, 255]
+    assert arrt.decode(Cursor(bytearray(b'\x01\x05'), zero_copy=True)) == [5]
+    arrt.check_value([])
+    arrt.check_value([0, 255])
+    for bad in [[256], [-1], [True], [1, 'a'], [1.0]]:
+        with pytest.raises(TypeError):
+            arrt.check_value(bad)
+    with pytest.raises(TypeError):
+        arrt.encode([1, 'a'])
+    with pytest.raises(TypeError):
+        ArrayT(Uint8, 2, False).encode([1])
+    assert ArrayT(Uint8, 2, False).decode(Cursor(b'\x01\x02')) == [1, 2]
+    assert arrt.to_json_serializable([1, 2]) == "0102"
+
+
+def test_int_vector():
+    for atype in [Uint16, Uint32, Uint64, Int8, Int16, Int32, Int64, Uint128, Int128]:
+        arrt = ArrayT(atype)
+        values = [atype.min_value, 0, 1, atype.max_value] * 10
+        encoded = arrt.encode(values)
+        assert encoded == b'\x28' + b''.join(atype.encode(x) for x in values)
+        assert arrt.decode(Cursor(encoded)) == values
+        arrt.check_value(values)
+        with pytest.raises(TypeError):
+            arrt.check_value(values + [atype.max_value + 1])
+        with pytest.raises(TypeError):
+            arrt.check_value(values + [atype.min_value - 1])
+        with pytest.raises(TypeError):
+            arrt.check_value(values + [False])
+    with pytest.raises(IOError):
+        ArrayT(Uint64).decode(Cursor(b'\x02' + b'\x00' * 15))
+    assert ArrayT(Uint32, 2, False).decode(Cursor(b'\x01\x00\x00\x00\x02\x00\x00\x00')) == [1, 2]
@@ -0,0 +1,51 @@
+from canoser import *
+from array import array
+import pytest
+
+
+class Account(Struct):
+    _fields = [('address', [Uint8, 32, False]), ('balance', Uint64), ('name', str)]
+
+
+accounts = [Account([i % 256] * 32, i * 1000, 'n' * (i % 5)) for i in range(100)]
+
+
+def test_serialize_many():
+    buffer, offsets = Account.serialize_many(accounts)
+    assert len(offsets) == len(accounts) + 1
+    assert offsets[0] == 0 and offsets[-1] == len(buffer)
+    for i, account in enumerate(accounts):
+        assert buffer[offsets[i]:offsets[i + 1]] == account.serialize()
+    assert Account.deserialize_many(buffer, offsets) == accounts
+    assert Account.deserialize_many(buffer) == accounts
+    assert Account.deserialize_many(bytearray(buffer), offsets, zero_copy=True) == accounts
+    assert Account.serialize_many([]) == (b'', array('Q', [0]))
+    assert Account.deserialize_many(b'') == []
+
+
+def test_deserialize_many_buffers():
+    buffers = [x.serialize() for x in accounts]
+    assert Account.deserialize_many(buffers) == accounts
+    assert Account.deserialize_many(buffers, validate=True) == accounts
+    with pytest.raises(IOError):
+        Account.deserialize_many([buffers[0] + b'\x00'])
+
+
+def test_deserialize_many_bad_offsets():
+    buffer, offsets = Account.serialize_many(accounts[:3])
+    offsets[1] += 1
+    with pytest.raises(IOError):
+        Account.deserialize_many(buffer, offsets)
+
+
+class Nothing(Struct):
+    _fields = []
+
+
+def test_deserialize_many_zero_width():
+    buffer, offsets = Nothing.serialize_many([Nothing(), Nothing()])
+    assert buffer == b''
+    assert Nothing.deserialize_many(buffer, offsets) == [Nothing(), Nothing()]
+    assert Nothing.deserialize_many(b'') == []
+    with pytest.raises(IOError):
+        Nothing.deserialize_many(b'\x00')
@@ -1,6 +1,7 @@
 import pytest
 import pdb
 from canoser import *
+from copy import copy
 
 class OptionUInt(RustOptional):
     _type = Uint8
@@ -49,3 +50,26 @@ def test_optional_struct_null():
     assert sx == b'\x00'
     x2 = OStruct.deserialize(sx)
     assert x2.opt.value is None
+
+
+class OptionList(RustOptional):
+    _type = [Uint16]
+
+def test_optional_list():
+    obj = OptionList([1, 2])
+    assert obj.value_type is OptionList.resolved_type()
+    assert obj.serialize() == b'\x01\x02\x01\x00\x02\x00'
+    assert OptionList.deserialize(obj.serialize()) == obj
+
+
+def test_none_shared():
+    none = OptionUInt.deserialize(b'\x00')
+    assert none is OptionUInt.deserialize(b'\x00', validate=True)
+    assert none == OptionUInt(None)
+    assert not hasattr(none, '__dict__')
+    with pytest.raises(TypeError):
+        none.value = 3
+    fresh = OptionUInt(None)
+    fresh.value = 3
+    assert copy(fresh).value == 3 and copy(none) is none
+    assert OptionUInt.deserialize(b'\x01\x03').value == 3
@@ -0,0 +1,31 @@
+from canoser import *
+from canoser.parallel import parallel_deserialize_many
+import pickle
+import pytest
+
+
+class Account(Struct):
+    _fields = [('address', [Uint8, 32, False]), ('balance', Uint64), ('name', str), ('tags', {str: Uint8})]
+
+
+accounts = [Account([i % 256] * 32, i * 1000, 'n' * (i % 5), {'t': i % 256}) for i in range(1000)]
+
+
+def test_parallel_deserialize_many():
+    buffer, offsets = Account.serialize_many(accounts)
+    assert parallel_deserialize_many(Account, buffer, offsets, workers=2) == accounts
+    assert parallel_deserialize_many(Account, buffer, offsets, workers=1) == accounts
+    assert parallel_deserialize_many(Account, b'', [0], workers=2) == []
+    offsets[1] += 1
+    with pytest.raises(IOError):
+        parallel_deserialize_many(Account, buffer, offsets, workers=2)
+
+
+def test_pickle_struct():
+    account = accounts[3]
+    data = pickle.dumps(account)
+    assert pickle.loads(data) == account
+    states = [(Account, {name: getattr(x, name) for name, _ in Account._fields}) for x in accounts]
+    assert len(pickle.dumps(accounts)) < len(pickle.dumps(states))
+    partial = Account(balance=5)
+    assert pickle.loads(pickle.dumps(partial)) == partial
@@ -0,0 +1,59 @@
+from canoser import *
+import pytest
+
+
+class Account(Struct):
+    _fields = [('address', [Uint8, 32, False]), ('balance', Uint64), ('name', str)]
+
+
+accounts = [Account([i % 256] * 32, i * 1000, 'n' * (i % 5)) for i in range(100)]
+
+
+def test_record_store(tmp_path):
+    path = str(tmp_path / 'accounts')
+    with RecordWriter(path, Account) as writer:
+        for i, account in enumerate(accounts[:60]):
+            assert writer.append(account, key=bytes(account.address) if i % 2 else None) == i
+    with RecordWriter(path, Account) as writer:
+        for account in accounts[60:]:
+            writer.append(account)
+    with RecordReader(path, Account) as reader:
+        assert len(reader) == 100
+        assert reader[42] == accounts[42] and reader[-1] == accounts[-1]
+        assert list(reader) == accounts
+        assert reader.get(bytes([3] * 32)) == accounts[3]
+        assert bytes([4] * 32) not in reader
+        assert reader.get(bytes([4] * 32)) is None
+        with pytest.raises(IndexError):
+            reader[100]
+
+
+def test_record_store_str_keys(tmp_path):
+    path = str(tmp_path / 'accounts')
+    with RecordWriter(path, Account, key_type=str) as writer:
+        writer.append(accounts[1], key='one')
+    with RecordReader(path, Account, key_type=str) as reader:
+        assert reader.get('one') == accounts[1]
+
+
+def test_record_store_recover(tmp_path):
+    path = str(tmp_path / 'accounts')
+    with RecordWriter(path, Account) as writer:
+        writer.append(accounts[1])
+    with open(path, 'ab') as fp:
+        fp.write(accounts[2].serialize()[:10])
+    with open(path + '.idx', 'ab') as fp:
+        fp.write(b'\x00\x01')
+    with RecordReader(path, Account) as reader:
+        assert list(reader) == [accounts[1]]
+    with RecordWriter(path, Account) as writer:
+        assert writer.append(accounts[3]) == 1
+    with RecordReader(path, Account) as reader:
+        assert list(reader) == [accounts[1], accounts[3]]
+
+
+def test_record_store_empty(tmp_path):
+    path = str(tmp_path / 'accounts')
+    RecordWriter(path, Account).close()
+    with RecordReader(path, Account) as reader:
+        assert len(reader) == 0
@@ -0,0 +1,63 @@
+from canoser import *
+from canoser.uleb128 import encode_uleb128
+import io
+import pytest
+
+
+class Account(Struct):
+    _fields = [('address', [Uint8, 32, False]), ('balance', Uint64), ('name', str), ('tags', [str])]
+
+
+accounts = [Account([i % 256] * 32, i * 1000, 'n' * (i * 7 % 300), ['t'] * (i % 4)) for i in range(100)]
+
+
+class Chunked(io.RawIOBase):
+    """Return at most `size` bytes per read, like a socket or a pipe."""
+
+    def __init__(self, data, size):
+        self.data = io.BytesIO(data)
+        self.size = size
+
+    def read(self, n=-1):
+        return self.data.read(min(n, self.size) if n >= 0 else self.size)
+
+
+def test_iter_deserialize_concat():
+    buffer, _ = Account.serialize_many(accounts)
+    for chunk_size in (1, 7, 64, 65536):
+        assert list(Account.iter_deserialize(io.BytesIO(buffer), chunk_size=chunk_size)) == accounts
+    assert list(Account.iter_deserialize(Chunked(buffer, 5), chunk_size=64)) == accounts
+    assert list(Account.iter_deserialize(io.BytesIO(b''))) == []
+
+
+def test_iter_deserialize_uleb128():
+    data = b''.join(encode_uleb128(len(x)) + x for x in (y.serialize() for y in accounts))
+    for chunk_size in (1, 7, 64, 65536):
+        fp = Chunked(data, 3)
+        assert list(Account.iter_deserialize(fp, 'uleb128', chunk_size)) == accounts
+
+
+def test_iter_deserialize_truncated():
+    buffer = accounts[1].serialize() + accounts[2].serialize()
+    records = Account.iter_deserialize(io.BytesIO(buffer[:-1]), chunk_size=8)
+    assert next(records) == accounts[1]
+    with pytest.raises(BufferUnderflowError):
+        next(records)
+    data = encode_uleb128(len(buffer)) + buffer
+    with pytest.raises(IOError):
+        list(Account.iter_deserialize(io.BytesIO(data), 'uleb128'))
+    with pytest.raises(IOError):
+        list(Account.iter_deserialize(io.BytesIO(data[:-1]), 'uleb128'))
+    with pytest.raises(TypeError):
+        Account.iter_deserialize(io.BytesIO(buffer), 'json')
+
+
+class Nothing(Struct):
+    _fields = []
+
+
+def test_iter_deserialize_zero_width():
+    with pytest.raises(IOError):
+        list(Nothing.iter_deserialize(io.BytesIO(b'\x00')))
+    framed = encode_uleb128(0) * 2
+    assert list(Nothing.iter_deserialize(io.BytesIO(framed), framing='uleb128')) == [Nothing(), Nothing()]
@@ -1,6 +1,8 @@
 import pytest
 import pdb
+import weakref
 from canoser import *
+from canoser.base import Base
 
 
 class Stock(Struct):
@@ -97,6 +99,61 @@ def test_map_empty():
     x2 = MapS2.deserialize(sx)
     assert x.counters == x2.counters
 
+
+def test_map_canonical_order():
+    x = MapS2({256: 1, 1: 2, 2: 3})
+    sx = x.serialize()
+    assert sx[1:3] == b'\x00\x01'
+    assert MapS2.deserialize(sx).counters == x.counters
+    assert x.serialize() == sx
+    with pytest.raises(TypeError):
+        MapS2.deserialize(b'\x02\x02\x00' + b'\x00' * 8 + b'\x01\x00' + b'\x00' * 8)
+    with pytest.raises(TypeError):
+        MapS2.deserialize(b'\x02\x01\x00' + b'\x00' * 8 + b'\x01\x00' + b'\x00' * 8)
+
+
+def test_map_key_cache():
+    atype = MapT(Uint32, Uint8)
+    small = {i: 1 for i in range(10)}
+    atype.encode(small)
+    assert list(atype._encoded_keys) == list(range(10))
+    for i in range(atype.key_cache_size):
+        atype.encoded_key(100000 + i)
+    assert len(atype._encoded_keys) == atype.key_cache_size
+    assert 0 not in atype._encoded_keys
+    large = {i: 1 for i in range(atype.key_cache_size + 1)}
+    assert atype.decode(Cursor(atype.encode(large))) == large
+    assert list(atype._encoded_keys) == list(range(atype.key_cache_size + 1))
+    atype.max_key_cache_size = 2000
+    huge = {i: 1 for i in range(2001)}
+    assert atype.decode(Cursor(atype.encode(huge))) == huge
+    assert list(atype._encoded_keys) == list(range(atype.key_cache_size + 1))
+
+
+class CountedKey(Uint32):
+    encoded = 0
+
+    @classmethod
+    def encode(cls, value):
+        CountedKey.encoded += 1
+        return Uint32.encode(value)
+
+
+def test_map_key_cache_large():
+    atype = MapT(CountedKey, Uint8)
+    large = {i: 1 for i in range(3000)}
+    data = atype.encode(large)
+    assert CountedKey.encoded == 3000
+    assert atype.encode(large) == data
+    assert CountedKey.encoded == 3000
+
+
+def test_map_bytes_key():
+    atype = MapT(ArrayT(Uint8), Uint8)
+    kvs = atype.decode(Cursor(atype.encode({b'ab': 1, b'a': 2})))
+    assert kvs == {b'a': 2, b'ab': 1}
+    assert all(type(k) is bytes for k in kvs)
+
 class ChineseMap(Struct):
     _fields = [('kvs', {str : str})]
 
@@ -162,4 +219,198 @@ def test_uint128_struct():
 def test_print_null_field():
     x = Uint128S()
     print(x)
-    print(x.__repr__())
\ No newline at end of file
+    print(x.__repr__())
+
+
+class StockEx(Stock):
+    _fields = [('name', str), ('shares', Uint8), ('price', Uint64)]
+
+
+def test_compiled_codec_not_inherited():
+    s1 = Stock('ACME', 50)
+    assert Stock.deserialize(s1.serialize()) == s1
+    assert Stock.encode_into._canoser_compiled
+    s2 = StockEx('ACME', 50, 7)
+    assert s2.serialize() == s1.serialize() + b'\x07' + b'\x00' * 7
+    assert StockEx.deserialize(s2.serialize()) == s2
+    with pytest.raises(IOError):
+        Stock.deserialize(b'\x04ACME')
+
+
+class CustomD(Struct):
+    _fields = [('x', Uint8), ('note', str)]
+
+    @classmethod
+    def decode(cls, cursor):
+        ret = super().decode(cursor)
+        ret.x += 1
+        return ret
+
+
+class OuterD(Struct):
+    _fields = [('inner', CustomD), ('name', str)]
+
+
+def test_own_codec_kept():
+    assert CustomD.deserialize(b'\x01\x00').x == 2
+    x = OuterD.deserialize(b'\x01\x00\x01a')
+    assert x.inner.x == 2
+    assert CustomD.deserialize(b'\x01\x00').x == 2
+    assert CustomD.decode.__func__ is not CustomD._compiled['decode']
+    with pytest.raises(TypeError):
+        Struct().serialize()
+
+    class Late(Struct):
+        _fields = [('x', Uint8)]
+    assert Late(3).serialize() == b'\x03'
+
+
+class Flag(Base):
+    @classmethod
+    def encode(cls, value):
+        return b'\x01' if value else b'\x00'
+
+    @classmethod
+    def decode(cls, cursor):
+        return cursor.read_u8() == 1
+
+    @classmethod
+    def check_value(cls, value):
+        if not isinstance(value, bool):
+            raise TypeError(f"{value} is not a bool")
+
+    @classmethod
+    def to_json_serializable(cls, value):
+        return value
+
+
+class Flags(Struct):
+    _fields = [('flags', [Flag]), ('last', Flag)]
+
+
+class Raw(Struct):
+    _fields = [('x', Uint8)]
+
+    @classmethod
+    def encode(cls, obj):
+        return b'\xff' + super().encode(obj)
+
+
+def test_encode_protocol():
+    x = Flags([True, False], True)
+    assert x.serialize() == b'\x02\x01\x00\x01'
+    assert Flags.deserialize(x.serialize()) == x
+    assert Raw(1).serialize() == b'\xff\x01'
+    assert ArrayT(Raw).encode([Raw(1), Raw(2)]) == b'\x02\xff\x01\xff\x02'
+
+
+class Nested(Struct):
+    _fields = [('stocks', [Stock]), ('kvs', {str: [Uint16]}), ('opt', 'test_optional.OptionUInt')]
+
+
+def test_trusted_decode(monkeypatch):
+    from test_optional import OptionUInt
+    x = Nested([Stock('A', 1), Stock('B', 2)], {'a': [1, 2]}, OptionUInt(3))
+    sx = x.serialize()
+    calls = []
+    monkeypatch.setattr(ArrayT, 'check_value', lambda self, arr: calls.append(arr))
+    assert Nested.deserialize(sx) == x
+    assert calls == []
+    assert Nested.deserialize(sx, validate=True) == x
+    assert len(calls) == 1
+
+
+class Transaction(Struct):
+    _fields = [('sender', [Uint8, 32, False]), ('sequence_number', Uint64), ('payload', [Uint8]),
+               ('max_gas_amount', Uint64), ('gas_unit_price', Uint64), ('args', [str]), ('expiration_time', Uint64)]
+
+
+def test_deserialize_fields():
+    tx = Transaction([1] * 32, 7, [2] * 100, 1000, 1, ['a', 'b'], 99)
+    data = tx.serialize()
+    ret = Transaction.deserialize(data, fields=['gas_unit_price', 'sequence_number'])
+    assert ret == Transaction(sequence_number=7, gas_unit_price=1)
+    ret = Transaction.deserialize(data, fields=['expiration_time'], validate=True)
+    assert ret == Transaction(expiration_time=99)
+    assert Transaction.deserialize(data[:50], check=False, fields=['sequence_number']).sequence_number == 7
+    with pytest.raises(IOError):
+        Transaction.deserialize(data + b'\x00', fields=['sequence_number'])
+    with pytest.raises(TypeError):
+        Transaction.deserialize(data, fields=['nonce'])
+    assert Transaction.plan(['args']) == [(None, 40), (None, ArrayT(Uint8)), (None, 16), ('args', ArrayT(StrT)), (None, 8)]
+    cursor = Cursor(data + b'\x00')
+    Transaction.skip(cursor)
+    assert cursor.offset == len(data)
+
+
+class Shouted(Struct):
+    _fields = [('name', str), ('id', Uint8)]
+
+    @classmethod
+    def decode(cls, cursor):
+        ret = super().decode(cursor)
+        ret.name = ret.name.upper()
+        return ret
+
+
+def test_deserialize_fields_own_decode():
+    ret = Shouted.deserialize(Shouted('abc', 1).serialize(), fields=['name'])
+    assert ret == Shouted('ABC', 1)
+
+
+def test_slots():
+    s = StockEx('ACME', 50, 7)
+    assert not hasattr(s, '__dict__')
+    assert StockEx.__slots__ == ('price',)
+    assert StockEx.price.expected_type == Uint64
+    assert Stock.name.expected_type == StrT
+    with pytest.raises(AttributeError):
+        s.extra = 1
+    with pytest.raises(TypeError):
+        s.price = -1
+    with pytest.raises(AttributeError):
+        Stock().name
+    assert Stock() == Stock()
+    assert Stock(name='A') != Stock(name='A', shares=0)
+
+
+def test_slots_declared():
+    class Tagged(Stock):
+        __slots__ = ('cache',)
+        _fields = [('name', str), ('shares', Uint8), ('tag', str)]
+
+    x = Tagged('A', 1, 't')
+    x.cache = 5
+    assert Tagged.deserialize(x.serialize()) == x
+    assert not hasattr(x, '__dict__')
+    assert weakref.ref(x)() is x and weakref.ref(Stock())() is not None
+    assert Struct.__slots__ == ('__weakref__',)
+
+
+def test_slots_rejected():
+    with pytest.raises(TypeError, match='should not start with __'):
+        class Private(Struct):
+            _fields = [('__secret', Uint8)]
+    with pytest.raises(TypeError, match='clashes with a class attribute'):
+        class Defaulted(Struct):
+            _fields = [('a', Uint8)]
+            a = 0
+
+    class Other(Struct):
+        _fields = [('x', Uint8)]
+    with pytest.raises(TypeError):
+        class Both(Stock, Other):
+            _fields = [('x', Uint8)]
+
+    class Fields:
+        _fields = [('x', Uint8)]
+    with pytest.raises(TypeError, match='more than one struct'):
+        class Mixed(Stock, Fields):
+            pass
+
+    class Mixin(Struct):
+        pass
+
+    class StockMix(StockEx, Mixin):
+        pass
+    assert StockMix('A', 1, 2).serialize() == StockEx('A', 1, 2).serialize()
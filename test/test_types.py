@@ -1,5 +1,6 @@
 from canoser import *
 from canoser.types import type_mapping
+from canoser.int_type import IntType
 import pdb
 import pytest
 
@@ -115,6 +116,19 @@ def test_uint16():
     assert Uint16.max_value == 65535
     assert Uint16.min_value == 0
 
+class Port(IntType):
+    pack_str = "<H"
+    byte_lens = 2
+    max_value = 65535
+    min_value = 0
+    signed = False
+
+
+def test_custom_int():
+    assert Port.encode(513) == b'\x01\x02'
+    assert Port.deserialize(b'\x01\x02') == 513
+
+
 def test_int16():
     assert Int16.encode(16) == b"\x10\x00"
     assert Int16.decode_bytes(b"\x10\x00") == 16
@@ -194,3 +208,14 @@ def test_type_mapping():
     atype = {Uint16: Uint64}
     mtype = type_mapping(atype)
     print(mtype)
+
+def test_type_mapping_interned():
+    assert type_mapping([Uint8]) is type_mapping([])
+    assert type_mapping([Uint8, 32]) is type_mapping([Uint8, 32])
+    assert type_mapping([Uint8, 32]) is not type_mapping([Uint8, 32, False])
+    assert type_mapping([Uint8, 32]) != type_mapping([Uint8, 32, False])
+    assert type_mapping({str: [bool]}) is type_mapping({str: [bool]})
+    assert type_mapping((str, Uint8)) is type_mapping((str, Uint8))
+    assert type_mapping(bytes) is type_mapping(bytes)
+    assert TupleT(StrT) != TupleT(StrT, Uint8)
+    assert type_mapping('canoser.Uint8') is Uint8
@@ -0,0 +1,27 @@
+from canoser import *
+from canoser.uleb128 import encode_uleb128, decode_uleb128, TABLE_SIZE
+import pytest
+
+
+def test_uleb128():
+    for value in [0, 1, 127, 128, 255, 16383, 16384, TABLE_SIZE - 1, TABLE_SIZE, 2**28, 2**32 - 1]:
+        encoded = encode_uleb128(value)
+        assert encoded == Uint32.serialize_uint32_as_uleb128(value)
+        assert decode_uleb128(encoded, 0, len(encoded)) == (value, len(encoded))
+        cursor = Cursor(b'\xff' + encoded)
+        cursor.read_u8()
+        assert cursor.read_uleb128() == value
+        assert cursor.is_finished()
+        writer = Writer()
+        writer.write_uleb128(value)
+        assert writer.getvalue() == encoded
+    assert encode_uleb128(300) == b'\xac\x02'
+
+
+def test_invalid_uleb128():
+    with pytest.raises(ValueError):
+        Cursor(b'\x80\x80').read_uleb128()
+    with pytest.raises(ValueError):
+        Cursor(b'').read_uleb128()
+    with pytest.raises(ValueError):
+        Cursor(b'\x80\x80\x80\x80\x80\x01').read_uleb128()
@@ -0,0 +1,124 @@
+from canoser import *
+from canoser.types import type_mapping
+from array import array
+import copy
+import pickle
+import pytest
+
+
+class Inner(Struct):
+    _fields = [('id', Uint32), ('name', str)]
+
+
+class Account(Struct):
+    _fields = [
+        ('address', [Uint8, 32, False]),
+        ('inner', Inner),
+        ('events', [Inner]),
+        ('balances', {str: Uint64}),
+        ('balance', Uint64),
+        ('sequence_number', Uint64),
+    ]
+
+
+account = Account([1] * 32, Inner(7, 'in'), [Inner(i, 'e' * i) for i in range(10)], {'a': 1, 'b': 2}, 100, 5)
+
+
+def test_view_lazy():
+    data = account.serialize()
+    view = Account.view(data)
+    assert isinstance(view, Account)
+    assert view.loaded_fields() == []
+    assert view.balance == 100
+    assert view.sequence_number == 5
+    assert view.loaded_fields() == ['balance', 'sequence_number']
+    assert view.inner.name == 'in'
+    assert view.inner.loaded_fields() == ['name']
+    assert view == account and account == view
+    assert view.serialize() == data
+    assert view.to_json() == account.to_json()
+
+
+def test_view_modified():
+    view = Account.view(account.serialize())
+    view.balance = 3
+    expected = copy.copy(account)
+    expected.balance = 3
+    assert view.serialize() == expected.serialize()
+    view = Account.view(account.serialize())
+    view.events.append(Inner(99, 'new'))
+    assert Account.deserialize(view.serialize()).events[-1] == Inner(99, 'new')
+    view = Account.view(account.serialize())
+    view.inner.id = 8
+    assert Account.deserialize(view.serialize()).inner.id == 8
+
+
+class Upper(Struct):
+    _fields = [('name', str), ('inner', Inner)]
+
+    @classmethod
+    def decode(cls, cursor):
+        ret = super().decode(cursor)
+        ret.name = ret.name.upper()
+        return ret
+
+
+class Outer(Struct):
+    _fields = [('upper', Upper), ('id', Uint8)]
+
+
+def test_view_own_decode():
+    data = Upper('abc', Inner(1, 'x')).serialize()
+    assert Upper.view(data) == Upper('ABC', Inner(1, 'x'))
+    view = Outer.view(Outer(Upper('abc', Inner(1, 'x')), 2).serialize())
+    assert view.upper.name == 'ABC'
+
+
+def test_view_pickle():
+    view = Account.view(account.serialize())
+    ret = pickle.loads(pickle.dumps(view))
+    assert type(ret) is Account
+    assert ret == account
+
+
+def test_skip():
+    data = account.serialize()
+    cursor = Cursor(data)
+    Account.skip(cursor)
+    assert cursor.is_finished()
+    for atype, value in [(Uint16, 3), (bool, True), (str, 'abc'), (bytes, b'xy'), ([Uint32], [1, 2]),
+                         ((str, Uint8), ('a', 1)), ({str: [Uint8]}, {'k': [1]})]:
+        atype = type_mapping(atype)
+        cursor = Cursor(atype.encode(value) + b'\x00')
+        atype.skip(cursor)
+        assert cursor.offset == len(atype.encode(value))
+
+
+def test_vec_view():
+    atype = type_mapping([Inner])
+    events = [Inner(i, 'e' * (i % 7)) for i in range(200)]
+    data = atype.encode(events)
+    view = atype.view(data)
+    assert len(view) == 200
+    assert view[150] == events[150] and view[-1] == events[-1]
+    assert view[10:13] == events[10:13]
+    assert list(view) == events
+    index = array('Q')
+    index.frombytes(view.index.tobytes())
+    view = atype.view(data, index)
+    assert view[199] == events[199]
+    with pytest.raises(IndexError):
+        view[200]
+    with pytest.raises(IOError):
+        atype.view(data, index[:-1])
+
+
+def test_vec_view_fixed_size():
+    atype = type_mapping([Uint64])
+    data = atype.encode(list(range(1000)))
+    view = atype.view(data)
+    assert view._index is None
+    assert view[999] == 999 and view[-2] == 998
+    assert view.offset(3) == 2 + 3 * 8
+    with pytest.raises(IOError):
+        atype.view(data[:-1])
@@ -0,0 +1,36 @@
+from canoser import *
+import pytest
+
+
+def test_write():
+    writer = Writer()
+    writer.write(b'\x01\x02')
+    writer.write_u8(3)
+    writer.write_uleb128(128)
+    assert len(writer) == 5
+    assert writer.getvalue() == b'\x01\x02\x03\x80\x01'
+
+
+class Item(Struct):
+    _fields = [('id', Uint32), ('tags', [str])]
+
+
+class Items(Struct):
+    _fields = [('items', [Item])]
+
+
+def test_encode_into_shared_buffer():
+    items = Items([Item(i, ['a' * (i % 3)]) for i in range(1000)])
+    bstr = items.serialize()
+    writer = Writer()
+    Items.encode_into(writer, items)
+    assert writer.getvalue() == bstr
+    assert Items.deserialize(bstr) == items
+
+
+def test_serialize_into_buffer():
+    buffer = bytearray(b'\xff')
+    item = Item(1, ['x'])
+    ret = item.serialize(buffer)
+    assert ret is buffer
+    assert buffer == b'\xff' + item.serialize()